@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+# Evento que se publica en la cola de pygame cuando termina un trabajo.
+# Atributos: job (Job), result (valor devuelto) y error (excepción o None).
+JOB_DONE_EVENT = pygame.event.custom_type()
+
+
+class Job:
+    """
+    Handle de un trabajo en segundo plano.
+
+    Cancelar un trabajo que todavía no empezó evita que se ejecute; si ya
+    está en marcha (p. ej. Graphviz renderizando), su resultado se descarta
+    y no llega a la cola de eventos.
+    """
+
+    def __init__(self, kind, owner=None):
+        self.kind = kind
+        # Escena que lanzó el trabajo: recibe el evento aunque no esté arriba
+        self.owner = owner
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def done_event(self):
+        """
+        El JOB_DONE_EVENT de un trabajo terminado (y no cancelado), armado a
+        partir de su resultado. Sirve para leerlo sin depender de que el
+        evento llegue a la escena que lanzó el trabajo.
+        """
+        if not self.done() or self.cancelled or self.future.cancelled():
+            return None
+        result, error = self.future.result()
+        return pygame.event.Event(JOB_DONE_EVENT, job=self, result=result, error=error)
+
+
+class BackgroundWorker:
+    """
+    Ejecuta funciones en hilos de fondo para no bloquear el bucle de pygame.
+    El resultado vuelve a la interfaz como un evento JOB_DONE_EVENT, que
+    SceneManager entrega a `owner` (la escena dueña de los trabajos).
+    """
+
+    def __init__(self, max_workers=1, owner=None):
+        self.owner = owner
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="chomsky-job"
+        )
+
+    def submit(self, kind, fn, *args, **kwargs):
+        job = Job(kind, self.owner)
+        job.future = self.executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            return None, None
+        result = None
+        error = None
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            error = e
+        if not job.cancelled:
+            pygame.event.post(
+                pygame.event.Event(JOB_DONE_EVENT, job=job, result=result, error=error)
+            )
+        return result, error
@@ -0,0 +1,151 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from classification_cache import ClassificationCache, default_cache
+from classifier import ChomskyClassifier
+from grammar_parser import GrammarParser
+
+
+# Clasificador de cada proceso trabajador (se crea en _init_worker)
+_worker_parser = None
+_worker_classifier = None
+
+
+def classify_many(
+    sources,
+    workers=None,
+    chunk_size=64,
+    ordered=True,
+    trace=False,
+    cache_dir=None,
+):
+    """
+    Clasifica muchas gramáticas en paralelo y genera los resultados a
+    medida que están listos.
+
+    - `sources`: iterable de textos de gramática (str) o rutas de archivo
+      (pathlib.Path u otro os.PathLike). Se consume de forma perezosa.
+    - `workers`: procesos del pool (por defecto, os.cpu_count()). Con 1 se
+      clasifica en el proceso actual, sin pool.
+    - `chunk_size`: gramáticas que recibe cada tarea del pool.
+    - `ordered`: True = mismo orden de entrada; False = orden de finalización.
+    - `trace`: incluir "explanation" y "steps" (más lento); por defecto solo
+      el veredicto y la primera producción que lo viola.
+    - `cache_dir`: nivel en disco de la caché de resultados, compartido por
+      todos los procesos y entre ejecuciones.
+
+    Cada resultado es un diccionario con "index" (posición en `sources`),
+    "source" (la ruta, o None para textos) y los campos de classify.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunked(enumerate(sources), chunk_size)
+
+    if workers == 1:
+        classifier = _make_classifier(cache_dir)
+        parser = GrammarParser()
+        for chunk in chunks:
+            yield from _classify_chunk(chunk, trace, parser, classifier)
+        return
+
+    # Se mantienen pocas tareas pendientes para no leer toda la entrada
+    max_pending = workers * 2
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(cache_dir,),
+    ) as executor:
+        pending = deque()
+        for chunk in itertools.islice(chunks, max_pending):
+            pending.append(executor.submit(_classify_chunk, chunk, trace))
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [f for f in pending if f in completed]
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                for chunk in itertools.islice(chunks, 1):
+                    pending.append(executor.submit(_classify_chunk, chunk, trace))
+                yield from future.result()
+
+
+def classify_source(source, trace=False, parser=None, classifier=None):
+    """Clasifica un único texto o ruta con la misma lógica que el lote."""
+    parser = parser or GrammarParser()
+    classifier = classifier or ChomskyClassifier(cache=default_cache)
+    path = os.fspath(source) if isinstance(source, os.PathLike) else None
+
+    try:
+        if path is not None:
+            ir = parser.parse_grammar_ir(_read_lines(path))
+        else:
+            ir = parser.parse_grammar_ir(source)
+
+        # Igual que en la interfaz: sin producciones, se trata como autómata
+        text = (lambda: _read_text(path)) if path is not None else source
+        result = classifier.classify_input(ir, text, trace=trace)
+    except Exception as e:
+        result = {
+            "type": "Error",
+            "description": "Error en el análisis",
+            "explanation": f"Error: {str(e)}",
+            "steps": [f"Error al procesar la entrada: {str(e)}"],
+            "violation": None,
+        }
+
+    record = {"source": path}
+    record.update(result)
+    return record
+
+
+# ----------------------------------------------------------------------
+# Internos
+# ----------------------------------------------------------------------
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _make_classifier(cache_dir):
+    if cache_dir:
+        return ChomskyClassifier(cache=ClassificationCache(disk_dir=cache_dir))
+    # En el proceso principal es la caché de la interfaz; en cada
+    # trabajador, default_cache es una instancia propia de ese proceso.
+    return ChomskyClassifier(cache=default_cache)
+
+
+def _init_worker(cache_dir):
+    global _worker_parser, _worker_classifier
+    _worker_parser = GrammarParser()
+    _worker_classifier = _make_classifier(cache_dir)
+
+
+def _classify_chunk(chunk, trace, parser=None, classifier=None):
+    parser = parser or _worker_parser
+    classifier = classifier or _worker_classifier
+    records = []
+    for index, source in chunk:
+        record = {"index": index}
+        record.update(classify_source(source, trace, parser, classifier))
+        records.append(record)
+    return records
+
+
+def _read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        yield from f
+
+
+def _read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
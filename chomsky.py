@@ -0,0 +1,196 @@
+"""
+Interfaz de línea de comandos (sin pygame) del clasificador.
+
+Uso:
+
+    python -m chomsky classify gramatica1.txt gramatica2.txt
+    cat corpus.txt | python -m chomsky classify
+    python -m chomsky classify --reduce generada.txt
+    python -m chomsky accepts gramatica.txt aabb abab
+
+Cada archivo (o la entrada estándar, con "-" o sin archivos) puede contener
+varias gramáticas separadas por una línea "---", igual que en
+"Comparar gramáticas" de la interfaz. Por cada gramática se escribe un
+objeto JSON por línea en la salida estándar. Con --reduce, antes de
+clasificar se eliminan los símbolos inútiles (ver grammar_reduction) y el
+registro incluye lo que se quitó. Las gramáticas repetidas se clasifican
+una sola vez (ver classification_cache); con --cache-dir los resultados se
+guardan también en disco y sirven para las ejecuciones siguientes.
+
+"accepts" indica, con CYK (ver membership), si cada cadena pertenece al
+lenguaje de una gramática libre de contexto; sin cadenas en la línea de
+comandos, se lee una por línea de la entrada estándar.
+
+Solo se importan módulos sin pygame para que el arranque sea rápido y se
+pueda usar en tuberías de shell; la reducción y CYK se cargan solo con
+--reduce y con "accepts".
+"""
+import argparse
+import json
+import sys
+
+from classification_cache import ClassificationCache, default_cache
+from classifier import ChomskyClassifier
+from grammar_parser import GrammarParser
+
+SEPARATOR = "---"
+
+
+def iter_grammar_blocks(lines):
+    """Agrupa las líneas en bloques separados por una línea '---'."""
+    block = []
+    for line in lines:
+        if line.strip() == SEPARATOR:
+            yield block
+            block = []
+        else:
+            block.append(line)
+    yield block
+
+
+def classify_block(block, parser, classifier, trace=False, reduce=False):
+    ir = parser.parse_grammar_ir(block)
+    if not (ir and reduce):
+        # Sin producciones: se interpreta como autómata, igual que en la interfaz
+        return classifier.classify_input(ir, lambda: "".join(block), trace=trace)
+
+    from grammar_reduction import reduce_grammar
+
+    reduction = reduce_grammar(ir)
+    # Si el lenguaje es vacío no queda nada que clasificar: se usa la original
+    result = dict(classifier.classify(reduction["grammar"] or ir, trace=trace))
+    result["reduction"] = {
+        "non_productive": reduction["non_productive"],
+        "unreachable": reduction["unreachable"],
+        "removed": len(reduction["removed"]),
+        "empty": reduction["empty"],
+        "reduced": reduction["reduced"],
+    }
+    return result
+
+
+def run_classify(args, out):
+    parser = GrammarParser()
+    cache = ClassificationCache(disk_dir=args.cache_dir) if args.cache_dir else default_cache
+    classifier = ChomskyClassifier(cache=cache)
+    exit_code = 0
+
+    for name in args.files or ["-"]:
+        if name == "-":
+            exit_code |= _emit_blocks(name, sys.stdin, parser, classifier, args, out)
+            continue
+
+        try:
+            f = open(name, encoding="utf-8")
+        except OSError as e:
+            _write_record(out, _error_record(name, None, e))
+            exit_code = 1
+            continue
+        with f:
+            exit_code |= _emit_blocks(name, f, parser, classifier, args, out)
+
+    return exit_code
+
+
+def run_accepts(args, out):
+    from membership import MembershipEngine
+
+    try:
+        with open(args.grammar, encoding="utf-8") as f:
+            engine = MembershipEngine(GrammarParser().parse_grammar_ir(f))
+    except (OSError, ValueError) as e:
+        _write_record(out, _error_record(args.grammar, None, e))
+        return 1
+
+    strings = args.strings
+    if not strings:
+        strings = (line.rstrip("\r\n") for line in sys.stdin)
+    for string in strings:
+        _write_record(out, {"string": string, "accepted": engine.accepts(string)})
+    return 0
+
+
+def _emit_blocks(name, lines, parser, classifier, args, out):
+    exit_code = 0
+    for index, block in enumerate(iter_grammar_blocks(lines)):
+        if not any(line.strip() for line in block):
+            continue
+        try:
+            record = {"source": name, "index": index}
+            record.update(classify_block(block, parser, classifier, args.trace, args.reduce))
+        except Exception as e:
+            record = _error_record(name, index, e)
+            exit_code = 1
+        _write_record(out, record)
+    return exit_code
+
+
+def _error_record(source, index, error):
+    # Mismas claves en todos los errores; "index" es None si no es de un bloque
+    return {"source": source, "index": index, "type": "Error", "error": str(error)}
+
+
+def _write_record(out, record):
+    out.write(json.dumps(record, ensure_ascii=False))
+    out.write("\n")
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m chomsky",
+        description="Clasificador de gramáticas según la Jerarquía de Chomsky (sin interfaz gráfica).",
+    )
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    classify = commands.add_parser(
+        "classify", help="Clasifica gramáticas y escribe un objeto JSON por línea."
+    )
+    classify.add_argument(
+        "files",
+        nargs="*",
+        help="Archivos de gramáticas; '-' o ninguno para leer la entrada estándar.",
+    )
+    classify.add_argument(
+        "--trace",
+        action="store_true",
+        help="Incluir la explicación paso a paso (más lento).",
+    )
+    classify.add_argument(
+        "--reduce",
+        action="store_true",
+        help="Eliminar no terminales no productivos e inalcanzables antes de clasificar.",
+    )
+    classify.add_argument(
+        "--cache-dir",
+        help="Directorio de la caché de resultados en disco, reutilizada entre ejecuciones.",
+    )
+
+    accepts = commands.add_parser(
+        "accepts",
+        help="Indica si cada cadena pertenece al lenguaje de una gramática libre de contexto.",
+    )
+    accepts.add_argument("grammar", help="Archivo con la gramática (Tipo 2 o 3).")
+    accepts.add_argument(
+        "strings",
+        nargs="*",
+        help="Cadenas a reconocer; si no se indican, se lee una por línea de la entrada estándar.",
+    )
+    return arg_parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    try:
+        if args.command == "classify":
+            return run_classify(args, sys.stdout)
+        if args.command == "accepts":
+            return run_accepts(args, sys.stdout)
+    except BrokenPipeError:
+        # p. ej. "| head": se deja de escribir sin mostrar un traceback
+        sys.stdout = None
+        return 1
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Versión de las reglas del clasificador y del formato del resultado. Forma
+# parte de la clave: hay que subirla cuando cambie lo que devuelve classify,
+# para que no se lean resultados viejos del nivel en disco.
+SCHEMA_VERSION = 1
+
+
+class ClassificationCache:
+    """
+    Caché de resultados de clasificación, direccionada por contenido.
+
+    La clave es el hash canónico de las producciones (GrammarIR.fingerprint)
+    más el modo de clasificación y SCHEMA_VERSION, así que la misma gramática escrita con
+    otro formato reutiliza el resultado.
+
+    - Nivel en memoria: LRU acotado a `max_entries` resultados y a un peso
+      total de `max_weight`. Cada resultado pesa lo que se indica en put()
+      (el clasificador usa la cantidad de producciones para los resultados
+      con explicación, que crecen con la gramática, y 1 para los rápidos);
+      un resultado más pesado que `max_weight` solo se guarda en disco.
+    - Nivel en disco (opcional): un archivo JSON por resultado en `disk_dir`;
+      sobrevive entre ejecuciones (p. ej. lotes nocturnos).
+
+    Los contadores hits / misses / disk_hits se consultan con stats().
+    """
+
+    def __init__(self, max_entries=256, max_weight=100_000, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.weight = 0
+        self.disk_dir = disk_dir
+        if self.disk_dir and not os.path.exists(self.disk_dir):
+            os.makedirs(self.disk_dir)
+
+        # clave -> (resultado, peso)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def key_for(self, ir, trace=True):
+        mode = "trace" if trace else "fast"
+        return f"{ir.fingerprint()}-{mode}-v{SCHEMA_VERSION}"
+
+    def get(self, key):
+        """Devuelve el resultado guardado para `key` o None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        result = self._load_from_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, result, self._disk_weight(result))
+        return result
+
+    def put(self, key, result, weight=1):
+        with self._lock:
+            self._store(key, result, weight)
+        self._save_to_disk(key, result)
+
+    def clear(self):
+        """Vacía el nivel en memoria y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+            self.hits = 0
+            self.misses = 0
+            self.disk_hits = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "weight": self.weight,
+                "max_weight": self.max_weight,
+            }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _store(self, key, result, weight):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.weight -= previous[1]
+        if weight > self.max_weight:
+            return
+        self._entries[key] = (result, weight)
+        self.weight += weight
+        while len(self._entries) > self.max_entries or self.weight > self.max_weight:
+            _, (_, dropped) = self._entries.popitem(last=False)
+            self.weight -= dropped
+
+    def _disk_weight(self, result):
+        # Lo leído de disco ya trae el texto: se pesa por sus pasos
+        return max(1, len(result.get("steps") or ()))
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _load_from_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if result.get("violation") is not None:
+            result["violation"] = tuple(result["violation"])
+        return result
+
+    def _save_to_disk(self, key, result):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(result), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            # El nivel en disco es opcional: si falla, se sigue en memoria
+            pass
+
+
+# Caché compartida por la interfaz, la exportación a PDF y los lotes
+default_cache = ClassificationCache()
@@ -1,8 +1,390 @@
-import re
+import heapq
+
+from grammar_ir import (
+    REG_BAD_LHS,
+    REG_EPSILON,
+    REG_LEFT_LINEAR,
+    REG_NOT_LINEAR,
+    REG_RIGHT_LINEAR,
+    REG_TERMINALS,
+    GrammarIR,
+    is_variable,
+    regular_code,
+)
+from profiler import timed
+
+START_SYMBOL = "S"
+
+
+def _length_check(lhs, rhs_len):
+    """Verificación de Tipo 1 de una producción: "s_epsilon", "reducing" o None."""
+    if rhs_len == 0 and lhs == START_SYMBOL:
+        return "s_epsilon"  # S → ε: se permite aparte
+    if rhs_len < len(lhs):
+        return "reducing"   # |β| < |α|
+    return None
+
+
+class _RegularCodes(dict):
+    """lado derecho -> regular_code, calculado la primera vez que se pide."""
+
+    def __missing__(self, rhs):
+        code = self[rhs] = regular_code(rhs)
+        return code
+
+
+def _grouped(grammar):
+    """Lista de (lhs, lados derechos) de un GrammarIR o de un diccionario."""
+    if isinstance(grammar, GrammarIR):
+        return list(grammar.iter_grouped())
+    return list(grammar.items())
+
+
+def _production_at(grammar, i):
+    """Producción (lhs, rhs) número i de un GrammarIR o de un diccionario."""
+    if isinstance(grammar, GrammarIR):
+        return grammar.lhs_text(i), grammar.rhs_text(i)
+    for lhs, rhs_list in grammar.items():
+        if i < len(rhs_list):
+            return lhs, rhs_list[i]
+        i -= len(rhs_list)
+    raise IndexError(i)
+
+
+# Pasos del análisis guardados como tuplas planas; el texto en español se
+# genera solo cuando se lee "steps" o "explanation":
+#   (código,)            paso general, texto fijo en STEP_TEXTS
+#   (código, lhs, rhs)   paso sobre una producción (ver _production_line)
+# y tres bloques que cubren las producciones desde la primera:
+#   ("productions",)           listado de todas las producciones
+#   ("regular", códigos)       verificación regular, un código REG_* por producción
+#   ("context_free", fin)      producciones [0, fin) compatibles con Tipo 2
+STEP_TEXTS = {
+    "start": "🔍 Iniciando análisis de la gramática.",
+    "listing": "Producciones detectadas:",
+    "check_regular": "\nPaso 1: ¿La gramática es Regular (Tipo 3)?",
+    "check_context_free": "\nPaso 2: ¿La gramática es Libre de Contexto (Tipo 2)?",
+    "check_context_sensitive": "\nPaso 3: ¿La gramática es Sensible al Contexto (Tipo 1)?",
+    "check_unrestricted": "\nPaso 4: La gramática es Recursivamente Enumerable (Tipo 0).",
+    "unrestricted": (
+        "No cumple las restricciones de los tipos 3, 2 ni 1, "
+        "por lo que se clasifica como Tipo 0 según la jerarquía de Chomsky."
+    ),
+    "regular_epsilon_note": (
+        " La gramática tiene producción(es) epsilon. "
+        "En una teoría más estricta se requiere un tratamiento especial, "
+        "pero aquí se acepta como Tipo 3 si el resto cumple."
+    ),
+    "regular_ok": "Todas las producciones cumplen la forma regular.",
+    "context_free_ok": "✅ Todas las producciones cumplen las condiciones de Tipo 2.",
+    "context_sensitive_s_in_rhs": (
+        "  ❌ Se encontró S → ε pero S aparece en el lado derecho de alguna producción."
+    ),
+    "context_sensitive_s_epsilon": (
+        "  ✅ Producción S → ε permitida (S no aparece en ningún lado derecho)."
+    ),
+    "context_sensitive_ok": (
+        "✅ Todas las producciones cumplen |β| ≥ |α| (condición simplificada de Tipo 1)."
+    ),
+}
+
+
+def _regular_line(code, lhs, rhs):
+    if code == REG_RIGHT_LINEAR:
+        return f"  ✅ {lhs} → {rhs} (forma derecha lineal)."
+    if code == REG_TERMINALS:
+        return f"  ✅ {lhs} → {rhs} (solo terminales, permitido en Tipo 3)."
+    if code == REG_LEFT_LINEAR:
+        return f"  ✅ {lhs} → {rhs} (forma izquierda lineal)."
+    if code == REG_EPSILON:
+        return f"  ⚠ {lhs} → ε (epsilon). Permitida solo si se maneja con cuidado."
+    if code == REG_NOT_LINEAR:
+        return (
+            f" {lhs} → {rhs} no cumple la forma lineal "
+            "(terminales + un solo no terminal en un extremo)."
+        )
+    return f"  ❌ Lado izquierdo '{lhs}' no es un solo no terminal; viola la forma regular."
+
+
+def _production_line(code, lhs, rhs):
+    if code == "context_free_bad_lhs":
+        return (
+            f" Lado izquierdo '{lhs}' no es un solo no terminal; "
+            "viola la definición de gramática libre de contexto."
+        )
+    # context_sensitive_reducing
+    return (
+        f"  ❌ Producción {lhs} → {rhs or 'ε'} "
+        f"reduce la longitud (|{lhs}|={len(lhs)}, |{rhs}|={len(rhs)})."
+    )
+
+
+def render_parts(records, grammar):
+    """
+    Convierte los pasos guardados en partes de texto: una línea (str) o un
+    bloque (prefix, rhs_list, suffix) con una línea prefix + rhs + suffix
+    por lado derecho. steps_of y explanation_of arman con ellas cada campo
+    sin un f-string por producción.
+    """
+    parts = []
+    blocks = None
+    for record in records:
+        code = record[0]
+        text = STEP_TEXTS.get(code)
+        if text is not None:
+            parts.append(text)
+            continue
+        if len(record) < 3 and blocks is None:
+            # Los lados derechos en texto se arman una sola vez
+            blocks = [(lhs, rhs_list) for lhs, rhs_list in _grouped(grammar) if rhs_list]
+        if code == "productions":
+            for lhs, rhs_list in blocks:
+                if "" in rhs_list:
+                    rhs_list = [rhs or "ε" for rhs in rhs_list]
+                parts.append((f"  {lhs} → ", rhs_list, ""))
+        elif code == "regular":
+            codes = record[1]
+            start = 0
+            for lhs, rhs_list in blocks:
+                if start >= len(codes):
+                    break
+                parts.extend([
+                    _regular_line(c, lhs, rhs)
+                    for c, rhs in zip(codes[start : start + len(rhs_list)], rhs_list)
+                ])
+                start += len(rhs_list)
+        elif code == "context_free":
+            left = record[1]
+            for lhs, rhs_list in blocks:
+                if left <= 0:
+                    break
+                if left < len(rhs_list):
+                    rhs_list = rhs_list[:left]
+                left -= len(rhs_list)
+                if "" in rhs_list:
+                    parts.extend([
+                        f"  ✅ {lhs} → {rhs} es compatible con Tipo 2."
+                        if rhs
+                        else f"  ✅ {lhs} → ε (epsilon permitido en Tipo 2)."
+                        for rhs in rhs_list
+                    ])
+                else:
+                    parts.append((f"  ✅ {lhs} → ", rhs_list, " es compatible con Tipo 2."))
+        else:
+            parts.append(_production_line(*record))
+    return parts
+
+
+def steps_of(parts, pieces=None):
+    """
+    Lista de líneas ("steps") a partir de render_parts. Cada bloque se une y
+    se vuelve a partir, que es más barato que un f-string por línea; si
+    algún símbolo trae un salto de línea, las líneas del bloque se arman
+    una por una. Con pieces, va dejando ahí los trozos de "explanation"
+    (ver explanation_of) para no volver a unir los bloques.
+    """
+    steps = []
+    for part in parts:
+        if part.__class__ is str:
+            steps.append(part)
+            if pieces is not None:
+                pieces += (part, "\n")
+            continue
+        prefix, rhs_list, suffix = part
+        text = (suffix + "\n" + prefix).join(rhs_list)
+        lines = text.split("\n")
+        if len(lines) == len(rhs_list):
+            lines[0] = prefix + lines[0]
+            lines[-1] += suffix
+        else:
+            lines = [f"{prefix}{rhs}{suffix}" for rhs in rhs_list]
+            text = "\n".join(lines)
+            prefix = suffix = ""
+        steps.extend(lines)
+        if pieces is not None:
+            pieces += (prefix, text, suffix, "\n")
+    return steps
+
+
+def explanation_of(parts):
+    """
+    Texto completo ("explanation") a partir de render_parts: las líneas de
+    cada bloque salen de un join, sin armarlas una por una.
+    """
+    pieces = []
+    for part in parts:
+        if part.__class__ is str:
+            pieces.append(part)
+        else:
+            prefix, rhs_list, suffix = part
+            pieces.append(prefix)
+            pieces.append((suffix + "\n" + prefix).join(rhs_list))
+            pieces.append(suffix)
+        pieces.append("\n")
+    return "".join(pieces[:-1])
+
+
+class ClassificationResult(dict):
+    """
+    Resultado de ChomskyClassifier.classify.
+
+    Se comporta como el diccionario de siempre ("type", "description",
+    "explanation", "steps", "violation"), pero guarda los pasos como tuplas
+    (ver render_parts) y arma cada campo de texto solo cuando se lee por
+    primera vez: la interfaz lee "explanation" sin pagar la lista de líneas
+    de "steps", que solo piden los informes. Con los dos armados se
+    descartan los pasos, junto con la gramática que hacía falta.
+    """
+
+    _LAZY_KEYS = ("explanation", "steps")
+
+    # También de clase: al copiar o deserializar, los campos se cargan antes
+    # que los atributos
+    records = grammar = _parts = None
+
+    def __init__(self, grammar_type, description, records, violation=None, grammar=None):
+        super().__init__(
+            type=grammar_type, description=description, violation=violation
+        )
+        self.records = records
+        self.grammar = grammar
+        self._parts = None
+
+    def _render(self, key=None):
+        """Arma el campo key ("steps" o "explanation"); None arma los dos."""
+        if self.records is not None:
+            self._parts = render_parts(self.records, self.grammar)
+            self.records = None
+            self.grammar = None
+        parts = self._parts
+        if parts is None:
+            return
+        has_steps = dict.__contains__(self, "steps")
+        has_explanation = dict.__contains__(self, "explanation")
+        if key != "steps" and not has_explanation and (key == "explanation" or has_steps):
+            dict.__setitem__(self, "explanation", explanation_of(parts))
+            has_explanation = True
+        if key != "explanation" and not has_steps:
+            if key == "steps" or has_explanation:
+                dict.__setitem__(self, "steps", steps_of(parts))
+            else:
+                pieces = []
+                dict.__setitem__(self, "steps", steps_of(parts, pieces))
+                dict.__setitem__(self, "explanation", "".join(pieces[:-1]))
+                has_explanation = True
+            has_steps = True
+        if not (has_steps and has_explanation):
+            return
+        # Mismo orden de claves que antes, sin importar qué se leyó primero
+        dict.__setitem__(self, "steps", dict.pop(self, "steps"))
+        self._parts = None
+
+    def __getitem__(self, key):
+        if key in self._LAZY_KEYS:
+            self._render(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key in self._LAZY_KEYS:
+            self._render(key)
+        return dict.get(self, key, default)
+
+    def _pending(self):
+        return self.records is not None or self._parts is not None
+
+    def __contains__(self, key):
+        return (key in self._LAZY_KEYS and self._pending()) or dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._render()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._render()
+        return dict.__len__(self)
+
+    def keys(self):
+        self._render()
+        return dict.keys(self)
+
+    def values(self):
+        self._render()
+        return dict.values(self)
+
+    def items(self):
+        self._render()
+        return dict.items(self)
+
+    def copy(self):
+        self._render()
+        return dict(self)
+
+    def __reversed__(self):
+        self._render()
+        return dict.__reversed__(self)
+
+    def __eq__(self, other):
+        self._render()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self._render()
+        return dict.__ne__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        self._render()
+        return dict.__repr__(self)
+
+    # Al modificar los campos de texto se arman antes, para que lo escrito
+    # por quien llama no se pise después con el texto de los pasos
+    def __setitem__(self, key, value):
+        if key in self._LAZY_KEYS:
+            self._render()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key in self._LAZY_KEYS:
+            self._render()
+        dict.__delitem__(self, key)
+
+    def pop(self, key, *default):
+        if key in self._LAZY_KEYS:
+            self._render()
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self._render()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        if key in self._LAZY_KEYS:
+            self._render()
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        self._render()
+        dict.update(self, *args, **kwargs)
+
+    def clear(self):
+        self.records = self.grammar = self._parts = None
+        dict.clear(self)
+
+    def __or__(self, other):
+        self._render()
+        return dict.__or__(self, other)
+
+    def __ior__(self, other):
+        self._render()
+        return dict.__ior__(self, other)
+
 
 class ChomskyClassifier:
     
-    def __init__(self):
+    def __init__(self, cache=None):
+        # Caché opcional de resultados (ver classification_cache)
+        self.cache = cache
         self.type_descriptions = {
             "Tipo 3": "Gramática Regular",
             "Tipo 2": "Gramática Libre de Contexto",
@@ -13,142 +395,250 @@ class ChomskyClassifier:
     # ------------------------------------------------------------------
     # API principal
     # ------------------------------------------------------------------
-    def classify(self, productions):
-        steps = []
-        steps.append("🔍 Iniciando análisis de la gramática.")
-        steps.append("Producciones detectadas:")
+    @timed("classify")
+    def classify(self, productions, trace=True):
+        """
+        Clasifica una gramática según la Jerarquía de Chomsky.
 
-        for lhs, rhs_list in productions.items():
-            for rhs in rhs_list:
-                rhs_str = rhs if rhs != "" else "ε"
-                steps.append(f"  {lhs} → {rhs_str}")
+        `productions` puede ser el diccionario de GrammarParser.parse_grammar,
+        un GrammarIR o un iterable de pares (lhs, rhs), p. ej.
+        GrammarParser.iter_productions.
+
+        Las producciones se recorren una sola vez (_scan_productions); la
+        explicación paso a paso se arma después a partir de esas marcas. Un
+        diccionario se recorre tal cual; otros iterables se pasan antes a
+        GrammarIR.
+
+        Con trace=False (modo rápido) no se genera explicación: se devuelve
+        solo "type", "description" y "violation", la primera producción
+        (lhs, rhs) que impide el tipo inmediatamente superior (None en Tipo 3).
+
+        Si el clasificador tiene caché, una gramática ya clasificada se
+        devuelve sin volver a analizarla (la clave sale de GrammarIR, así que
+        en ese caso también un diccionario se convierte).
+        """
+        if self.cache is None:
+            if not isinstance(productions, dict):
+                productions = GrammarIR.coerce(productions)
+            return self._classify(productions, trace)
+
+        ir = GrammarIR.coerce(productions)
+        key = self.cache.key_for(ir, trace)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._classify(ir, trace)
+            # Los resultados con explicación crecen con la gramática
+            self.cache.put(key, result, len(ir) if trace else 1)
+        return result
+
+    def _classify(self, grammar, trace):
+        """Clasifica un GrammarIR o un diccionario como el de parse_grammar."""
+        scan = self._scan_productions(grammar)
+        grammar_type, violation = self._verdict(grammar, scan)
+
+        if not trace:
+            return {
+                "type": grammar_type,
+                "description": self.type_descriptions[grammar_type],
+                "violation": violation,
+            }
+
+        if isinstance(grammar, dict):
+            # El texto se arma al leerlo: se guarda una copia por si quien
+            # llamó modifica después sus listas
+            grammar = {lhs: tuple(rhs_list) for lhs, rhs_list in grammar.items()}
+
+        steps = [("start",), ("listing",), ("productions",)]
 
         # Comprobación jerárquica: 3 ⊂ 2 ⊂ 1 ⊂ 0
-        steps.append("\nPaso 1: ¿La gramática es Regular (Tipo 3)?")
-        if self._is_regular(productions, steps):
-            return self._build_result("Tipo 3", steps)
+        steps.append(("check_regular",))
+        if self._is_regular(grammar, scan, steps):
+            return self._build_trace_result("Tipo 3", steps, violation, grammar)
 
-        steps.append("\nPaso 2: ¿La gramática es Libre de Contexto (Tipo 2)?")
-        if self._is_context_free(productions, steps):
-            return self._build_result("Tipo 2", steps)
+        steps.append(("check_context_free",))
+        if self._is_context_free(grammar, scan, steps):
+            return self._build_trace_result("Tipo 2", steps, violation, grammar)
 
-        steps.append("\nPaso 3: ¿La gramática es Sensible al Contexto (Tipo 1)?")
-        if self._is_context_sensitive(productions, steps):
-            return self._build_result("Tipo 1", steps)
+        steps.append(("check_context_sensitive",))
+        if self._is_context_sensitive(grammar, scan, steps):
+            return self._build_trace_result("Tipo 1", steps, violation, grammar)
 
         # Si no cumple los criterios anteriores, es Tipo 0
-        steps.append("\nPaso 4: La gramática es Recursivamente Enumerable (Tipo 0).")
-        steps.append(
-            "No cumple las restricciones de los tipos 3, 2 ni 1, "
-            "por lo que se clasifica como Tipo 0 según la jerarquía de Chomsky."
-        )
-        return self._build_result("Tipo 0", steps)
+        steps.append(("check_unrestricted",))
+        steps.append(("unrestricted",))
+        return self._build_trace_result("Tipo 0", steps, violation, grammar)
 
     # ------------------------------------------------------------------
-    # Verificaciones de tipo
+    # Recorrido único de las producciones
     # ------------------------------------------------------------------
-    def _symbol_classes(self, rhs):
+    def _scan_productions(self, grammar):
         """
-        Divide una cadena rhs en:
-            - terminals: índices de símbolos terminales
-            - nonterminals: índices de símbolos no terminales
-        Convención:
-            - No terminal = letra mayúscula (A-Z)
-            - Terminal = cualquier otro símbolo visible
+        Recorre las producciones una sola vez, un bloque de lado izquierdo
+        por vez, y calcula las marcas de violación de los tipos 3, 2 y 1.
+
+        Con un GrammarIR el código regular y el largo de cada lado derecho ya
+        están calculados por forma (shape_regular, shape_len); con un
+        diccionario se calculan una vez por lado derecho distinto. Dentro de
+        un bloque todo se resuelve con operaciones sobre bytes, sin una
+        llamada de Python por producción: solo las candidatas a violar el
+        Tipo 1 (lados derechos más cortos que el izquierdo) pasan por
+        _length_check.
+
+        Devuelve un diccionario con:
+            - count: cantidad de producciones
+            - regular_codes: bytearray con un código REG_* por producción
+            - first_regular_violation: índice de la primera producción no regular
+            - first_context_free_violation: índice del primer LHS que no es
+              un solo no terminal
+            - reducing: índices de producciones con |β| < |α|
+            - has_epsilon: hay alguna producción ε
+            - s_epsilon: índice de la producción S → ε (None si no hay)
+            - s_in_rhs: S aparece en algún lado derecho (solo se calcula si
+              hay S → ε)
         """
-        terminals = []
-        nonterminals = []
-        for i, ch in enumerate(rhs):
-            if ch.isupper():
-                nonterminals.append(i)
+        if isinstance(grammar, GrammarIR):
+            names = grammar.lhs_names
+            prod_shape = grammar.prod_shape
+            blocks = (
+                (names[lid], prod_shape[start:end]) for lid, start, end in grammar.iter_blocks()
+            )
+            regular_of = grammar.shape_regular.__getitem__
+            length_of = grammar.shape_len.__getitem__
+        else:
+            blocks = grammar.items()
+            regular_of = _RegularCodes().__getitem__
+            length_of = len
+
+        codes = bytearray()
+        first_regular = None
+        first_context_free = None
+        reducing = []
+        has_epsilon = False
+        s_epsilon = None
+        bad_lhs = bytes((REG_BAD_LHS,))
+        i = 0
+
+        for lhs, rhs_keys in blocks:
+            count = len(rhs_keys)
+            if not count:
+                continue
+
+            # Tipo 3 y Tipo 2: forma del lado izquierdo y del derecho
+            if is_variable(lhs):
+                block = bytes(map(regular_of, rhs_keys))
+                if first_regular is None:
+                    j = block.find(REG_NOT_LINEAR)
+                    if j >= 0:
+                        first_regular = i + j
+                # Con un lado izquierdo de un carácter, solo ε puede reducir
+                candidates = []
+                j = block.find(REG_EPSILON)
+                while j >= 0:
+                    candidates.append((j, 0))
+                    j = block.find(REG_EPSILON, j + 1)
+                if candidates:
+                    has_epsilon = True
             else:
-                terminals.append(i)
-        return terminals, nonterminals
-
-    def _is_regular(self, productions, steps):
-        all_right_linear = True
-        all_left_linear = True
-        has_eps = False
-
-        for lhs, rhs_list in productions.items():
-            if len(lhs) != 1 or not lhs.isupper():
-                steps.append(
-                    f"  ❌ Lado izquierdo '{lhs}' no es un solo no terminal; "
-                    "viola la forma regular."
-                )
-                return False
-
-            for rhs in rhs_list:
-                if rhs == "":
-                    # ε-producción
-                    has_eps = True
-                    steps.append(f"  ⚠ {lhs} → ε (epsilon). Permitida solo si se maneja con cuidado.")
-                    continue
-
-                terminals, nonterminals = self._symbol_classes(rhs)
-
-                if len(nonterminals) == 0:
-                    # Solo terminales: OK
-                    steps.append(f"  ✅ {lhs} → {rhs} (solo terminales, permitido en Tipo 3).")
-                    continue
-
-                if len(nonterminals) == 1:
-                    nt_pos = nonterminals[0]
-                    # Verificamos que todo lo demás sean terminales
-                    if all(i in terminals or i == nt_pos for i in range(len(rhs))):
-                        if nt_pos == len(rhs) - 1:
-                            # ...A  (right-linear)
-                            steps.append(f"  ✅ {lhs} → {rhs} (forma derecha lineal).")
-                            all_left_linear = False
-                            continue
-                        if nt_pos == 0:
-                            # A... (left-linear)
-                            steps.append(f"  ✅ {lhs} → {rhs} (forma izquierda lineal).")
-                            all_right_linear = False
-                            continue
-
-                # Si llega aquí, la producción no es regular
-                steps.append(
-                    f" {lhs} → {rhs} no cumple la forma lineal "
-                    "(terminales + un solo no terminal en un extremo)."
+                block = bad_lhs * count
+                if first_regular is None:
+                    first_regular = i
+                if first_context_free is None:
+                    first_context_free = i
+                lengths = list(map(length_of, rhs_keys))
+                candidates = []
+                if min(lengths) < len(lhs):
+                    candidates = [(j, n) for j, n in enumerate(lengths) if n < len(lhs)]
+            codes += block
+
+            # Tipo 1: S → ε se permite aparte; el resto no puede reducir
+            for j, rhs_len in candidates:
+                check = _length_check(lhs, rhs_len)
+                if check == "reducing":
+                    reducing.append(i + j)
+                elif check == "s_epsilon" and s_epsilon is None:
+                    s_epsilon = i + j
+            i += count
+
+        s_in_rhs = False
+        if s_epsilon is not None:
+            if isinstance(grammar, GrammarIR):
+                s_in_rhs = grammar.occurs_in_rhs(START_SYMBOL)
+            else:
+                s_in_rhs = any(
+                    START_SYMBOL in rhs for rhs_list in grammar.values() for rhs in rhs_list
                 )
-                return False
+
+        return {
+            "count": i,
+            "regular_codes": codes,
+            "first_regular_violation": first_regular,
+            "first_context_free_violation": first_context_free,
+            "reducing": reducing,
+            "has_epsilon": has_epsilon,
+            "s_epsilon": s_epsilon,
+            "s_in_rhs": s_in_rhs,
+        }
+
+    def _verdict(self, grammar, scan):
+        """
+        Decide el tipo a partir del recorrido. Devuelve (tipo, violación),
+        donde violación es la primera producción (lhs, rhs) que impide el
+        tipo inmediatamente superior.
+        """
+        if scan["first_regular_violation"] is None:
+            return "Tipo 3", None
+
+        if scan["first_context_free_violation"] is None:
+            return "Tipo 2", _production_at(grammar, scan["first_regular_violation"])
+
+        context_free_violation = _production_at(grammar, scan["first_context_free_violation"])
+        s_violation = scan["s_epsilon"] is not None and scan["s_in_rhs"]
+        if not scan["reducing"] and not s_violation:
+            return "Tipo 1", context_free_violation
+
+        if scan["reducing"]:
+            i = scan["reducing"][0]
+        else:
+            i = scan["s_epsilon"]
+        return "Tipo 0", _production_at(grammar, i)
+
+    # ------------------------------------------------------------------
+    # Verificaciones de tipo (a partir del recorrido)
+    # ------------------------------------------------------------------
+    def _is_regular(self, grammar, scan, steps):
+        first_violation = scan["first_regular_violation"]
+        codes = scan["regular_codes"]
+        end = scan["count"] if first_violation is None else first_violation + 1
+        steps.append(("regular", codes[:end]))
+
+        if first_violation is not None:
+            return False
 
         # Si todas las producciones pasaron
-        if has_eps:
-            steps.append(
-                " La gramática tiene producción(es) epsilon. "
-                "En una teoría más estricta se requiere un tratamiento especial, "
-                "pero aquí se acepta como Tipo 3 si el resto cumple."
-            )
-        steps.append("Todas las producciones cumplen la forma regular.")
+        if scan["has_epsilon"]:
+            steps.append(("regular_epsilon_note",))
+        steps.append(("regular_ok",))
         return True
 
-    def _is_context_free(self, productions, steps):
+    def _is_context_free(self, grammar, scan, steps):
         """
         Verifica si la gramática es Libre de Contexto (Tipo 2).
         Criterios:
         - Cada lado izquierdo es un solo no terminal (mayúscula).
         - El lado derecho puede ser cualquier cadena de terminales/no terminales (incluyendo ε).
         """
-        for lhs, rhs_list in productions.items():
-            if len(lhs) != 1 or not lhs.isupper():
-                steps.append(
-                    f" Lado izquierdo '{lhs}' no es un solo no terminal; "
-                    "viola la definición de gramática libre de contexto."
-                )
-                return False
+        first_violation = scan["first_context_free_violation"]
+        end = scan["count"] if first_violation is None else first_violation
+        steps.append(("context_free", end))
 
-            for rhs in rhs_list:
-                if rhs == "":
-                    steps.append(f"  ✅ {lhs} → ε (epsilon permitido en Tipo 2).")
-                else:
-                    steps.append(f"  ✅ {lhs} → {rhs} es compatible con Tipo 2.")
+        if first_violation is not None:
+            steps.append(("context_free_bad_lhs", *_production_at(grammar, first_violation)))
+            return False
 
-        steps.append("✅ Todas las producciones cumplen las condiciones de Tipo 2.")
+        steps.append(("context_free_ok",))
         return True
 
-    def _is_context_sensitive(self, productions, steps):
+    def _is_context_sensitive(self, grammar, scan, steps):
         """
         Verifica si la gramática es Sensible al Contexto (Tipo 1).
 
@@ -157,61 +647,47 @@ class ChomskyClassifier:
         - Se permite S → ε solo si S no aparece en ningún lado derecho.
         """
         context_sensitive = True
-        has_s_epsilon = False
-        start_symbol = "S"
-
-        # Verificar si S -> ε existe
-        for lhs, rhs_list in productions.items():
-            for rhs in rhs_list:
-                if lhs == start_symbol and rhs == "":
-                    has_s_epsilon = True
-
-        # Verificar cada producción
-        for lhs, rhs_list in productions.items():
-            for rhs in rhs_list:
-                alpha = lhs
-                beta = rhs
-
-                if has_s_epsilon and lhs == start_symbol and rhs == "":
-                    # S → ε: permitido si S no aparece en RHS de ninguna producción
-                    continue
-
-                alpha_len = len(alpha)
-                beta_len = len(beta)
-
-                if beta_len < alpha_len:
-                    steps.append(
-                        f"  ❌ Producción {lhs} → {rhs if rhs != '' else 'ε'} "
-                        f"reduce la longitud (|{alpha}|={alpha_len}, |{beta}|={beta_len})."
-                    )
-                    context_sensitive = False
-
-        if has_s_epsilon:
+
+        for i in scan["reducing"]:
+            steps.append(("context_sensitive_reducing", *_production_at(grammar, i)))
+            context_sensitive = False
+
+        if scan["s_epsilon"] is not None:
             # verificar que S no aparezca en ningún lado derecho
-            s_in_rhs = False
-            for lhs, rhs_list in productions.items():
-                for rhs in rhs_list:
-                    if "S" in rhs:
-                        s_in_rhs = True
-                        break
-                if s_in_rhs:
-                    break
-            if s_in_rhs:
-                steps.append(
-                    "  ❌ Se encontró S → ε pero S aparece en el lado derecho de alguna producción."
-                )
+            if scan["s_in_rhs"]:
+                steps.append(("context_sensitive_s_in_rhs",))
                 context_sensitive = False
             else:
-                steps.append(
-                    "  ✅ Producción S → ε permitida (S no aparece en ningún lado derecho)."
-                )
+                steps.append(("context_sensitive_s_epsilon",))
 
         if context_sensitive:
-            steps.append(
-                "✅ Todas las producciones cumplen |β| ≥ |α| (condición simplificada de Tipo 1)."
-            )
+            steps.append(("context_sensitive_ok",))
         return context_sensitive
 
+    def classify_input(self, productions, text, trace=True):
+        """
+        Clasifica la entrada como lo hacen la interfaz, el lote y la línea
+        de comandos: las producciones si hay alguna y, si no, `text` como
+        autómata. `text` también puede ser una función que devuelve el
+        texto; solo se llama si hace falta.
+
+        Con trace=False el resultado del autómata se recorta a las claves
+        del modo rápido de classify.
+        """
+        if not isinstance(productions, (GrammarIR, dict)):
+            productions = GrammarIR.from_pairs(productions)
+        if productions:
+            return self.classify(productions, trace=trace)
+
+        result = self.classify_automaton_from_text(text() if callable(text) else text)
+        if not trace:
+            result = {
+                "type": result["type"],
+                "description": result["description"],
+                "violation": None,
+            }
+        return result
+
     # ------------------------------------------------------------------
     # Clasificación de autómatas desde texto (muy sencilla)
     # ------------------------------------------------------------------
@@ -258,6 +734,15 @@ class ChomskyClassifier:
         )
         return self._build_result("Tipo 0", steps)
 
+    def _build_trace_result(self, grammar_type, records, violation, grammar):
+        return ClassificationResult(
+            grammar_type,
+            self.type_descriptions.get(grammar_type, "Clasificación desconocida"),
+            records,
+            violation,
+            grammar,
+        )
+
     def _build_result(self, grammar_type, steps):
         return {
             "type": grammar_type,
@@ -267,3 +752,222 @@ class ChomskyClassifier:
             "explanation": "\n".join(steps),
             "steps": steps,
         }
+
+
+class ClassificationSession:
+    """
+    Clasificación incremental (modo rápido, como classify(trace=False)).
+
+    Lleva contadores de violaciones por producción en lugar de volver a
+    recorrer la gramática: producciones no regulares (Tipo 3), lados
+    izquierdos que no son un solo no terminal (Tipo 2), producciones que
+    reducen la longitud y S → ε (Tipo 1), más la cantidad de apariciones
+    de S en lados derechos. add() y remove() actualizan esos contadores,
+    así que el veredicto cuesta O(producciones cambiadas).
+
+    Cada producción tiene una clave que da su posición en el texto: la que
+    indica quien llama (IncrementalParser pasa la de su línea) o, sin clave,
+    el orden en que se agregó. La violación informada es la misma que
+    devuelve classify: la primera de las que incumplen con las producciones
+    agrupadas por lado izquierdo, en el orden en que aparece cada uno.
+    """
+
+    CHECKS = ("regular", "context_free", "reducing", "s_epsilon")
+    # Un montículo se compacta cuando tiene más del doble de entradas vivas
+    # (más este mínimo)
+    COMPACT_MIN = 64
+
+    def __init__(self, classifier=None, productions=None):
+        self.classifier = classifier or ChomskyClassifier()
+        self.clear()
+        if productions is not None:
+            for lhs, rhs in GrammarIR.coerce(productions).iter_productions():
+                self.add(lhs, rhs)
+
+    def clear(self):
+        self.counts = dict.fromkeys(self.CHECKS, 0)
+        self.s_in_rhs = 0
+        # clave -> (lhs, rhs, verificaciones que incumple)
+        self._live = {}
+        # (lhs, rhs) -> claves, para quitar por contenido sin clave
+        self._handles = {}
+        self._next = 0
+        # lhs -> [cantidad de producciones, montículo de sus claves, clave
+        # de su primera aparición]
+        self._lhs = {}
+        # verificación -> lhs -> [cantidad que incumple, montículo de claves]
+        self._violating = {check: {} for check in self.CHECKS}
+        # verificación -> montículo de (primera aparición, lhs) de los lados
+        # izquierdos con alguna producción que incumple
+        self._order = {check: [] for check in self.CHECKS}
+
+    def __len__(self):
+        return len(self._live)
+
+    def _violations(self, lhs, rhs):
+        # Mismas reglas que _scan_productions
+        checks = []
+        if not is_variable(lhs):
+            checks += ("regular", "context_free")
+        elif regular_code(rhs) == REG_NOT_LINEAR:
+            checks.append("regular")
+        length = _length_check(lhs, len(rhs))
+        if length is not None:
+            checks.append(length)
+        return tuple(checks)
+
+    def add(self, lhs, rhs, key=None):
+        """
+        Agrega la producción lhs → rhs en la posición `key` (cualquier valor
+        comparable y distinto para cada producción; sin clave, después de
+        todas las agregadas sin clave). Devuelve la clave.
+        """
+        if key is None:
+            key = self._next
+            self._next += 1
+            self._handles.setdefault((lhs, rhs), []).append(key)
+        checks = self._violations(lhs, rhs)
+        self._live[key] = (lhs, rhs, checks)
+
+        group = self._lhs.get(lhs)
+        moved = False
+        if group is None:
+            group = self._lhs[lhs] = [0, [], key]
+        elif key < group[2]:
+            group[2] = key
+            moved = True
+        group[0] += 1
+        heapq.heappush(group[1], key)
+
+        for check in checks:
+            self.counts[check] += 1
+            violating = self._violating[check]
+            entry = violating.get(lhs)
+            if entry is None:
+                entry = violating[lhs] = [0, []]
+                if not moved:
+                    heapq.heappush(self._order[check], (group[2], lhs))
+            entry[0] += 1
+            heapq.heappush(entry[1], key)
+        if moved:
+            self._reorder(lhs, key)
+        self.s_in_rhs += rhs.count(START_SYMBOL)
+        return key
+
+    def remove(self, lhs, rhs, key=None):
+        """
+        Quita la producción lhs → rhs agregada con `key`; sin clave, la
+        última aparición agregada sin clave.
+        """
+        if key is None:
+            handles = self._handles.get((lhs, rhs))
+            if not handles:
+                raise KeyError(f"La producción {lhs} → {rhs or 'ε'} no está en la sesión.")
+            key = handles.pop()
+            if not handles:
+                del self._handles[(lhs, rhs)]
+        entry = self._live.get(key)
+        if entry is None or entry[:2] != (lhs, rhs):
+            raise KeyError(f"La producción {lhs} → {rhs or 'ε'} no está en la sesión.")
+        del self._live[key]
+        self.s_in_rhs -= rhs.count(START_SYMBOL)
+
+        # Los montículos se limpian al consultarlos (ver _first) o, si se
+        # llenan de entradas quitadas, de una vez (ver _compact)
+        for check in entry[2]:
+            self.counts[check] -= 1
+            violating = self._violating[check]
+            group = violating[lhs]
+            group[0] -= 1
+            if not group[0]:
+                del violating[lhs]
+            else:
+                self._compact(lhs, group, check)
+            order = self._order[check]
+            if len(order) > 2 * len(violating) + self.COMPACT_MIN:
+                order[:] = [(self._lhs[name][2], name) for name in violating]
+                heapq.heapify(order)
+
+        group = self._lhs[lhs]
+        group[0] -= 1
+        if not group[0]:
+            del self._lhs[lhs]
+            return
+        self._compact(lhs, group)
+        if key == group[2]:
+            heap = group[1]
+            while not self._valid(heap[0], lhs):
+                heapq.heappop(heap)
+            group[2] = heap[0]
+            self._reorder(lhs, heap[0])
+
+    def apply(self, removed=(), added=(), key=None):
+        """
+        Aplica un cambio: quita los pares `removed` y agrega los de `added`.
+        Con `key` (la posición entera de una línea), el par j de la línea usa
+        la clave (key << 32) + j.
+        """
+        if key is None:
+            for lhs, rhs in removed:
+                self.remove(lhs, rhs)
+            for lhs, rhs in added:
+                self.add(lhs, rhs)
+            return
+        key <<= 32
+        for j, (lhs, rhs) in enumerate(removed):
+            self.remove(lhs, rhs, key + j)
+        for j, (lhs, rhs) in enumerate(added):
+            self.add(lhs, rhs, key + j)
+
+    def _valid(self, key, lhs, check=None):
+        entry = self._live.get(key)
+        return entry is not None and entry[0] == lhs and (check is None or check in entry[2])
+
+    def _reorder(self, lhs, first):
+        # Cambió la primera aparición de lhs: las entradas viejas de _order
+        # quedan inválidas y se descartan al consultarlas
+        for check in self.CHECKS:
+            if lhs in self._violating[check]:
+                heapq.heappush(self._order[check], (first, lhs))
+
+    def _compact(self, lhs, group, check=None):
+        count, heap = group[:2]
+        if len(heap) > 2 * count + self.COMPACT_MIN:
+            heap[:] = set(key for key in heap if self._valid(key, lhs, check))
+            heapq.heapify(heap)
+
+    def _first(self, check):
+        order = self._order[check]
+        violating = self._violating[check]
+        while True:
+            first, lhs = order[0]
+            if lhs in violating and self._lhs[lhs][2] == first:
+                break
+            heapq.heappop(order)
+        heap = violating[lhs][1]
+        while not self._valid(heap[0], lhs, check):
+            heapq.heappop(heap)
+        lhs, rhs, _ = self._live[heap[0]]
+        return lhs, rhs
+
+    def verdict(self):
+        """(tipo, violación) con las mismas reglas que ChomskyClassifier._verdict."""
+        counts = self.counts
+        if not counts["regular"]:
+            return "Tipo 3", None
+        if not counts["context_free"]:
+            return "Tipo 2", self._first("regular")
+
+        s_violation = counts["s_epsilon"] and self.s_in_rhs
+        if not counts["reducing"] and not s_violation:
+            return "Tipo 1", self._first("context_free")
+        return "Tipo 0", self._first("reducing" if counts["reducing"] else "s_epsilon")
+
+    def result(self):
+        """Resultado en el formato de classify(trace=False)."""
+        grammar_type, violation = self.verdict()
+        return {
+            "type": grammar_type,
+            "description": self.classifier.type_descriptions[grammar_type],
+            "violation": violation,
+        }
@@ -1,49 +1,147 @@
+import time
+
 import pygame
-from classifier import ChomskyClassifier
-from grammar_parser import GrammarParser
-from visualizer import GrammarVisualizer
-from report_generator import ReportGenerator
+from background_jobs import JOB_DONE_EVENT, BackgroundWorker
+from classification_cache import default_cache
+from classifier import ChomskyClassifier, ClassificationSession
+from frame_scheduler import DirtyRegions
+from grammar_parser import GrammarParser, IncrementalParser
+from render_cache import LineSurfaceCache, get_font, iter_wrapped, render_text
+from text_buffer import GapBuffer
+
+
+def analyze_text(classifier, snapshot, trace=True):
+    """
+    Clasifica como en "Clasificar" las producciones de `snapshot` (ver
+    IncrementalParser.snapshot), o su texto como autómata si no hay
+    ninguna. Se ejecuta en un hilo de fondo, así que ni el GrammarIR ni la
+    clasificación bloquean el dibujo.
+    """
+    result = classifier.classify_input(snapshot.ir(), snapshot.text or "", trace=trace)
+    if trace:
+        # La explicación se arma al leerla: mejor aquí que al dibujar
+        result.get("explanation")
+    return result
+
+
+def generate_diagram(visualizer, snapshot):
+    """
+    Genera en un hilo de fondo el diagrama de `snapshot` (ver
+    IncrementalParser.snapshot): el de la gramática si tiene producciones y,
+    si no, el del texto como autómata / MT. Devuelve (tipo, ruta, error),
+    con tipo "grammar" o "automaton"; el error se devuelve en lugar de
+    lanzarse para que el mensaje diga de qué diagrama era.
+    """
+    kind = "grammar"
+    try:
+        productions = snapshot.ir()
+        if productions:
+            return kind, visualizer.generate_diagram(productions), None
+        kind = "automaton"
+        return kind, visualizer.generate_automaton_diagram_from_text(snapshot.text), None
+    except Exception as e:
+        return kind, None, e
+
+
+def export_report(classifier, report_generator, snapshot):
+    """
+    Clasifica `snapshot` (tomado con el texto completo) y genera el PDF, en
+    un hilo de fondo. Devuelve (resultado, nombre del archivo).
+    """
+    productions = snapshot.ir()
+    if productions:
+        result = classifier.classify(productions)
+    else:
+        # Si no hay producciones, se trata como autómata / MT
+        result = classifier.classify_automaton_from_text(snapshot.text)
+    filename = report_generator.generate_pdf(result, grammar_text=snapshot.text)
+    return result, filename
 
 
 class ClassifierUI:
     def __init__(self, screen, assets):
         self.screen = screen
         self.assets = assets
-        self.classifier = ChomskyClassifier()
+        self.classifier = ChomskyClassifier(cache=default_cache)
         self.parser = GrammarParser()
-        self.visualizer = GrammarVisualizer()
-        self.report_generator = ReportGenerator()
-
-        # Texto de entrada y resultado
-        self.input_text = ""
+        # Producciones del editor, reparseadas solo en las líneas editadas;
+        # la sesión recibe esos cambios y mantiene el veredicto en vivo
+        self.session = ClassificationSession(self.classifier)
+        self.grammar = IncrementalParser(self.parser, self.session)
+        # graphviz y fpdf se cargan al generar el primer diagrama / PDF
+        self._visualizer = None
+        self._report_generator = None
+
+        # Trabajos en segundo plano: diagramas de Graphviz y análisis
+        # (clasificar con F1 y análisis en vivo pueden correr a la vez)
+        self.jobs = BackgroundWorker(owner=self)
+        self.analysis = BackgroundWorker(max_workers=2, owner=self)
+        self.diagram_job = None
+        self.classify_job = None
+        self.export_job = None
+
+        # Análisis en vivo: tras `live_delay` ms sin editar se reclasifica
+        # en segundo plano; solo cuenta el trabajo de la última edición
+        self.live_analysis = True
+        self.live_delay = 400
+        self.live_job = None
+        self.live_job_version = None
+        self.live_result = None
+        self.live_version = None     # versión del texto de live_result
+        self.live_diagnostics = (0, None)   # (cantidad, primer aviso)
+        self._edit_version = 0
+        self._edit_time = 0
+
+        # Texto de entrada (buffer con hueco, ver text_buffer) y resultado
+        self.buffer = GapBuffer()
         self.result = None
-        self.running = True
 
         # Editor de texto
         self.cursor_pos = 0          # índice en el string
         self.selection_start = None  # None = sin selección
         self.cursor_visible = True
-        self.cursor_timer = 0
+        self.cursor_timer = 0        # ms del último cambio de parpadeo
 
         # Áreas de entrada y salida
         self.input_rect = pygame.Rect(60, 120, 900, 260)
         self.output_rect = pygame.Rect(60, 420, 900, 260)
+        self.status_rect = pygame.Rect(60, 745, 900, 20)
+
+        # Desplazamiento vertical de cada panel (primera línea visible) y
+        # panel cuya barra se está arrastrando ("editor" / "output" / None)
+        self.editor_scroll = 0
+        self.output_scroll = 0
+        self.dragging_scrollbar = None
+
+        # Resultado ya partido en líneas, válido para _result_layout_key.
+        # Un resultado enorme se parte de a poco (_layout_pending, ver
+        # continue_layout) para no congelar la interfaz.
+        self._result_layout = []
+        self._result_layout_key = None
+        self._layout_pending = None
 
         self.buttons = []
         self.active_input = True
 
+        # Zonas a redibujar en el próximo cuadro (ver frame_scheduler)
+        self.dirty = DirtyRegions(screen.get_rect())
+
         # Fuentes
         try:
-            self.editor_font = pygame.font.Font("DejaVuSansMono.ttf", 24)
-            self.result_font = pygame.font.Font("DejaVuSansMono.ttf", 20)
+            self.editor_font = get_font("DejaVuSansMono.ttf", 24)
+            self.result_font = get_font("DejaVuSansMono.ttf", 20)
         except Exception:
             # Por si no se encuentra el archivo, usar la default
-            self.editor_font = pygame.font.Font(None, 24)
-            self.result_font = pygame.font.Font(None, 20)
+            self.editor_font = get_font(None, 24)
+            self.result_font = get_font(None, 20)
 
-        self.ui_font_small = pygame.font.Font(None, 22)
-        self.ui_font_button = pygame.font.Font(None, 26)
-        self.ui_font_title = pygame.font.Font(None, 40)
+        self.ui_font_small = get_font(None, 22)
+        self.ui_font_button = get_font(None, 26)
+        self.ui_font_title = get_font(None, 40)
+
+        # Líneas del editor y del resultado ya renderizadas (ver render_cache)
+        self.editor_lines = LineSurfaceCache((0, 0, 0))
+        self.result_lines = LineSurfaceCache((0, 0, 0))
 
         self.setup_ui()
 
@@ -83,24 +181,46 @@ class ClassifierUI:
             },
         ]
 
-    # -------------------- LOOP PRINCIPAL --------------------
+    @property
+    def visualizer(self):
+        if self._visualizer is None:
+            from visualizer import GrammarVisualizer
+
+            self._visualizer = GrammarVisualizer()
+        return self._visualizer
 
-    def run(self):
-        clock = pygame.time.Clock()
-        self.running = True
+    @property
+    def report_generator(self):
+        if self._report_generator is None:
+            from report_generator import ReportGenerator
 
-        while self.running:
-            for event in pygame.event.get():
-                result = self.handle_event(event)
-                if result == "menu":
-                    return "menu"
-                if result == "quit":
-                    return "quit"
+            self._report_generator = ReportGenerator()
+        return self._report_generator
 
-            self.cursor_blink()
-            self.draw()
-            pygame.display.flip()
-            clock.tick(60)
+    @property
+    def input_text(self):
+        return self.buffer.text()
+
+    @input_text.setter
+    def input_text(self, text):
+        self.buffer.set_text(text)
+
+    # -------------------- CICLO DE VIDA --------------------
+    # El bucle es el de scene_manager.SceneManager; la escena se conserva
+    # (con su texto y resultado) al volver al menú.
+
+    def update(self):
+        self.cursor_blink()
+        self.poll_jobs()
+        self.continue_layout()
+        if not self.grammar.is_current(self.buffer):
+            self.grammar.sync(self.buffer, budget_ms=6)
+        if self.live_analysis:
+            self.schedule_live_analysis()
+
+    def close(self):
+        self.jobs.shutdown()
+        self.analysis.shutdown()
 
     # -------------------- EVENTOS --------------------
 
@@ -108,19 +228,58 @@ class ClassifierUI:
         if event.type == pygame.QUIT:
             return "quit"
 
+        # Mover el mouse solo cambia algo al arrastrar una barra
+        if event.type != pygame.MOUSEMOTION or self.dragging_scrollbar:
+            self.dirty.add_all()
+
+        if event.type == pygame.KEYDOWN:
+            # Mientras se escribe el cursor queda visible
+            self.cursor_visible = True
+            self.cursor_timer = pygame.time.get_ticks()
+
+        if event.type == JOB_DONE_EVENT:
+            self.finish_job(event)
+            return
+
+        if event.type == pygame.MOUSEWHEEL:
+            pane = self.pane_at(pygame.mouse.get_pos())
+            if pane:
+                first, _, _ = self.pane_lines(pane)
+                self.scroll_pane(pane, first - event.y * 3)
+            return
+
+        if event.type == pygame.MOUSEMOTION and self.dragging_scrollbar:
+            self.drag_scrollbar(self.dragging_scrollbar, event.pos[1])
+            return
+
+        if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging_scrollbar = None
+            return
+
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.input_rect.collidepoint(event.pos):
                 self.active_input = True
             else:
                 self.active_input = False
 
+            pane = self.pane_at(event.pos)
+            if event.button == 1 and pane and self.scrollbar_track(pane).collidepoint(event.pos):
+                _, visible, total = self.pane_lines(pane)
+                if total > visible:
+                    self.dragging_scrollbar = pane
+                    self.drag_scrollbar(pane, event.pos[1])
+                return
+
             if event.button == 1:
                 for button in self.buttons:
                     if button["rect"].collidepoint(event.pos):
-                        self.execute_action(button["action"])
+                        return self.execute_action(button["action"])
 
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
+                # ESC cancela primero un diagrama en curso
+                if self.cancel_diagram():
+                    return
                 return "menu"
 
             # Atajos globales
@@ -130,9 +289,13 @@ class ClassifierUI:
             elif event.key == pygame.K_F2:
                 self.load_example()
                 return
+            elif event.key == pygame.K_F3:
+                self.toggle_live_analysis()
+                return
 
             if self.active_input:
                 self.handle_text_input(event)
+                self.scroll_to_caret()
 
     # -------------------- MANEJO DE TEXTO (EDITOR) --------------------
 
@@ -143,7 +306,7 @@ class ClassifierUI:
         if ctrl:
             if event.key == pygame.K_a:  # Ctrl + A
                 self.selection_start = 0
-                self.cursor_pos = len(self.input_text)
+                self.cursor_pos = len(self.buffer)
                 return
             elif event.key == pygame.K_c:  # Ctrl + C
                 self.copy_selection()
@@ -159,7 +322,7 @@ class ClassifierUI:
             self.selection_start = None
 
         elif event.key == pygame.K_RIGHT:
-            if self.cursor_pos < len(self.input_text):
+            if self.cursor_pos < len(self.buffer):
                 self.cursor_pos += 1
             self.selection_start = None
 
@@ -179,25 +342,27 @@ class ClassifierUI:
             self.move_cursor_vertical(1)
             self.selection_start = None
 
+        elif event.key == pygame.K_PAGEUP:
+            self.move_cursor_vertical(-self.visible_editor_lines())
+            self.selection_start = None
+
+        elif event.key == pygame.K_PAGEDOWN:
+            self.move_cursor_vertical(self.visible_editor_lines())
+            self.selection_start = None
+
         # --- Borrado ---
         elif event.key == pygame.K_BACKSPACE:
             if self.has_selection():
                 self.delete_selection()
             elif self.cursor_pos > 0:
-                self.input_text = (
-                    self.input_text[: self.cursor_pos - 1]
-                    + self.input_text[self.cursor_pos :]
-                )
+                self.buffer.delete(self.cursor_pos - 1, self.cursor_pos)
                 self.cursor_pos -= 1
 
         elif event.key == pygame.K_DELETE:
             if self.has_selection():
                 self.delete_selection()
-            elif self.cursor_pos < len(self.input_text):
-                self.input_text = (
-                    self.input_text[: self.cursor_pos]
-                    + self.input_text[self.cursor_pos + 1 :]
-                )
+            elif self.cursor_pos < len(self.buffer):
+                self.buffer.delete(self.cursor_pos, self.cursor_pos + 1)
 
         # --- Saltos y tabulación ---
         elif event.key == pygame.K_RETURN:
@@ -221,18 +386,14 @@ class ClassifierUI:
     def insert_text(self, text):
         if self.has_selection():
             self.delete_selection()
-        self.input_text = (
-            self.input_text[: self.cursor_pos]
-            + text
-            + self.input_text[self.cursor_pos :]
-        )
+        self.buffer.insert(self.cursor_pos, text)
         self.cursor_pos += len(text)
         self.selection_start = None
 
     def delete_selection(self):
         start = min(self.selection_start, self.cursor_pos)
         end = max(self.selection_start, self.cursor_pos)
-        self.input_text = self.input_text[:start] + self.input_text[end:]
+        self.buffer.delete(start, end)
         self.cursor_pos = start
         self.selection_start = None
 
@@ -241,7 +402,7 @@ class ClassifierUI:
             return
         start = min(self.selection_start, self.cursor_pos)
         end = max(self.selection_start, self.cursor_pos)
-        selected = self.input_text[start:end]
+        selected = self.buffer.slice(start, end)
         try:
             import pyperclip
 
@@ -262,55 +423,153 @@ class ClassifierUI:
             self.insert_text(clip)
 
     def move_cursor_line_home(self):
-        before = self.input_text[: self.cursor_pos]
-        last_newline = before.rfind("\n")
-        if last_newline == -1:
-            self.cursor_pos = 0
-        else:
-            self.cursor_pos = last_newline + 1
+        lines = self.buffer.lines
+        self.cursor_pos = lines.line_start(lines.line_of(self.cursor_pos))
 
     def move_cursor_line_end(self):
-        after = self.input_text[self.cursor_pos :]
-        next_newline = after.find("\n")
-        if next_newline == -1:
-            self.cursor_pos = len(self.input_text)
-        else:
-            self.cursor_pos += next_newline
+        lines = self.buffer.lines
+        self.cursor_pos = lines.line_end(lines.line_of(self.cursor_pos))
 
     def move_cursor_vertical(self, direction):
-        lines = self.input_text.split("\n")
+        lines = self.buffer.lines
 
         # localizar línea y columna actuales
-        total = 0
-        line_index = 0
-        col = 0
-        for i, line in enumerate(lines):
-            line_len = len(line)
-            if self.cursor_pos <= total + line_len:
-                line_index = i
-                col = self.cursor_pos - total
-                break
-            total += len(line) + 1  # +1 por el '\n'
+        line_index = lines.line_of(self.cursor_pos)
+        col = self.cursor_pos - lines.line_start(line_index)
 
         new_line = line_index + direction
-        if new_line < 0 or new_line >= len(lines):
+        if direction < -1 or direction > 1:
+            # Avance por páginas: se detiene en la primera / última línea
+            new_line = max(0, min(new_line, lines.line_count() - 1))
+        if new_line < 0 or new_line >= lines.line_count():
             return
 
-        new_line_len = len(lines[new_line])
-        new_col = min(col, new_line_len)
-
         # calcular nueva posición absoluta
-        new_pos = 0
-        for i in range(new_line):
-            new_pos += len(lines[i]) + 1
-        new_pos += new_col
-        self.cursor_pos = new_pos
+        new_start = lines.line_start(new_line)
+        new_col = min(col, lines.line_end(new_line) - new_start)
+        self.cursor_pos = new_start + new_col
+
+    # Desplazamiento del editor y del resultado
+    def pane_at(self, pos):
+        if self.input_rect.collidepoint(pos):
+            return "editor"
+        if self.output_rect.collidepoint(pos):
+            return "output"
+        return None
+
+    def pane_area(self, pane):
+        """Zona de texto del panel (sin bordes ni título)."""
+        if pane == "editor":
+            return self.input_rect.inflate(-8, -8)
+        rect = self.output_rect
+        return pygame.Rect(rect.x + 10, rect.y + 40, rect.width - 20, rect.height - 50)
+
+    def pane_lines(self, pane):
+        """(primera línea visible, líneas visibles, total de líneas) del panel."""
+        if pane == "editor":
+            return self.editor_scroll, self.visible_editor_lines(), self.editor_line_count()
+        visible = max(1, self.pane_area(pane).height // self.result_font.get_linesize())
+        return self.output_scroll, visible, len(self.result_layout())
+
+    def editor_line_count(self):
+        return self.buffer.lines.line_count()
+
+    def visible_editor_lines(self):
+        return max(1, self.pane_area("editor").height // self.editor_font.get_linesize())
+
+    def scroll_pane(self, pane, first_line):
+        _, visible, total = self.pane_lines(pane)
+        first_line = max(0, min(first_line, total - visible))
+        if pane == "editor":
+            self.editor_scroll = first_line
+        else:
+            self.output_scroll = first_line
+
+    def scroll_to_caret(self):
+        """Desplaza el editor lo mínimo para que el cursor quede visible."""
+        cursor_line = self.buffer.lines.line_of(self.cursor_pos)
+        visible = self.visible_editor_lines()
+        if cursor_line < self.editor_scroll:
+            self.scroll_pane("editor", cursor_line)
+        elif cursor_line >= self.editor_scroll + visible:
+            self.scroll_pane("editor", cursor_line - visible + 1)
+        else:
+            self.scroll_pane("editor", self.editor_scroll)
+
+    def scrollbar_track(self, pane):
+        area = self.pane_area(pane)
+        return pygame.Rect(area.right - 10, area.y, 10, area.height)
+
+    def scrollbar_thumb(self, pane):
+        track = self.scrollbar_track(pane)
+        first, visible, total = self.pane_lines(pane)
+        thumb_height = max(20, track.height * visible // max(total, 1))
+        max_scroll = max(1, total - visible)
+        y = track.y + (track.height - thumb_height) * first // max_scroll
+        return pygame.Rect(track.x, y, track.width, thumb_height)
+
+    def drag_scrollbar(self, pane, mouse_y):
+        track = self.scrollbar_track(pane)
+        thumb = self.scrollbar_thumb(pane)
+        free = max(1, track.height - thumb.height)
+        fraction = (mouse_y - track.y - thumb.height / 2) / free
+        _, visible, total = self.pane_lines(pane)
+        self.scroll_pane(pane, round(fraction * (total - visible)))
+
+    def draw_scrollbar(self, pane):
+        pygame.draw.rect(self.screen, (200, 200, 200), self.scrollbar_track(pane), border_radius=4)
+        pygame.draw.rect(self.screen, (120, 120, 120), self.scrollbar_thumb(pane), border_radius=4)
+
+    def result_layout(self):
+        """
+        Líneas del resultado partidas al ancho del panel. Se recalculan solo
+        cuando cambia el resultado (o el ancho), no en cada cuadro.
+        """
+        explanation = self.result.get("explanation", "") if self.result else ""
+        # Se reserva siempre el ancho de la barra para no volver a partir
+        # el texto cuando aparece
+        width = self.pane_area("output").width - 14
+        key = (explanation, width)
+        if key != self._result_layout_key:
+            self._result_layout = []
+            self._result_layout_key = key
+            self._layout_pending = iter_wrapped(explanation, self.result_font, width)
+            self.output_scroll = 0
+            self.continue_layout()
+        return self._result_layout
+
+    def continue_layout(self, budget_ms=6):
+        """Parte más líneas del resultado, sin pasar de `budget_ms` en este cuadro."""
+        pending = self._layout_pending
+        if pending is None:
+            return
+        deadline = time.perf_counter() + budget_ms / 1000
+        layout = self._result_layout
+        for line in pending:
+            layout.append(line)
+            if len(layout) % 64 == 0 and time.perf_counter() > deadline:
+                break
+        else:
+            self._layout_pending = None
+        self.dirty.add(self.output_rect)
+
+    @property
+    def busy(self):
+        return self._layout_pending is not None or not self.grammar.ready
 
     def cursor_blink(self):
-        self.cursor_timer += 1
-        if self.cursor_timer >= 30:
+        now = pygame.time.get_ticks()
+        if now - self.cursor_timer >= 500:
             self.cursor_visible = not self.cursor_visible
-            self.cursor_timer = 0
+            self.cursor_timer = now
+            # Solo hay que redibujar la línea del cursor
+            line = self.buffer.lines.line_of(self.cursor_pos) - self.editor_scroll
+            if 0 <= line < self.visible_editor_lines():
+                area = self.pane_area("editor")
+                line_height = self.editor_font.get_linesize()
+                self.dirty.add(
+                    pygame.Rect(area.x, area.y + line * line_height, area.width, line_height)
+                )
 
     # -------------------- ACCIONES LÓGICAS --------------------
 
@@ -326,20 +585,29 @@ class ClassifierUI:
         elif action == "compare":
             self.compare_grammars()
         elif action == "menu":
-            self.running = False
+            return "menu"
 
     def classify_grammar(self):
-        try:
-            productions = self.parser.parse_grammar(self.input_text)
-
-            if productions:
-                self.result = self.classifier.classify(productions)
-            else:
-                # Si no se pudo parsear como gramática, probar como autómata
-                self.result = self.classifier.classify_automaton_from_text(
-                    self.input_text
-                )
-        except Exception as e:
+        if self.classify_job is not None:
+            self.classify_job.cancel()
+        self.classify_job = self.analysis.submit(
+            "classify", analyze_text, self.classifier, self.grammar.snapshot(self.buffer)
+        )
+        self.result = {
+            "type": "Información",
+            "description": "Clasificando...",
+            "explanation": "Analizando la gramática en segundo plano...",
+            "steps": [],
+        }
+
+    def finish_classify(self, event):
+        if event.job is not self.classify_job:
+            return  # resultado de una clasificación ya reemplazada
+        self.classify_job = None
+        e = event.error
+        if e is None:
+            self.result = event.result
+        else:
             self.result = {
                 "type": "Error",
                 "description": "Error en el análisis",
@@ -347,6 +615,79 @@ class ClassifierUI:
                 "steps": [f"Error al procesar la entrada: {str(e)}"],
             }
 
+    # --- Análisis en vivo ---
+
+    def toggle_live_analysis(self):
+        self.live_analysis = not self.live_analysis
+        if not self.live_analysis and self.live_job is not None:
+            self.live_job.cancel()
+            self.live_job = None
+
+    def schedule_live_analysis(self):
+        """Lanza el análisis cuando el texto lleva `live_delay` ms sin cambios."""
+        version = self.buffer.version
+        now = pygame.time.get_ticks()
+        if version != self._edit_version:
+            self._edit_version = version
+            self._edit_time = now
+            return
+        if version in (self.live_version, self.live_job_version):
+            return  # ya analizado o en curso
+        if now - self._edit_time < self.live_delay or not self.grammar.ready:
+            return
+
+        # Un análisis de un texto anterior ya no sirve
+        if self.live_job is not None:
+            self.live_job.cancel()
+            self.live_job = None
+            self.live_job_version = None
+        self.dirty.add(self.status_rect)
+
+        if len(self.session):
+            # Gramática: la sesión ya tiene el veredicto al día
+            self.live_diagnostics = self.grammar.diagnostics_summary()
+            self.live_result = self.session.result()
+            self.live_version = version
+            return
+
+        # Sin producciones: probar el texto como autómata en segundo plano
+        self.live_diagnostics = (0, None)
+        self.live_job = self.analysis.submit(
+            "live", analyze_text, self.classifier, self.grammar.snapshot(self.buffer), False
+        )
+        self.live_job_version = version
+
+    def finish_live_analysis(self, event):
+        if event.job is not self.live_job:
+            return
+        self.live_job = None
+        self.live_version = self.live_job_version
+        self.live_job_version = None
+        if event.error is None:
+            self.live_result = event.result
+        else:
+            self.live_result = {"type": "Error", "description": str(event.error)}
+
+    def status_text(self):
+        if not self.live_analysis:
+            return "Análisis en vivo desactivado (F3 para activarlo)"
+        if not len(self.buffer):
+            return "Análisis en vivo: escriba una gramática o autómata"
+        if self.live_result is None or self.live_version != self.buffer.version:
+            return "Análisis en vivo: analizando..."
+
+        result = self.live_result
+        text = f"En vivo: {result['type']} - {result['description']}"
+        violation = result.get("violation")
+        if violation:
+            lhs, rhs = violation
+            text += f"   (regla que impide un tipo más restrictivo: {lhs} → {rhs or 'ε'})"
+        count, first = self.live_diagnostics
+        if first is not None:
+            number, _, message = first
+            text += f"   [{count} aviso(s); línea {number}: {message}]"
+        return text
+
     def visualize_grammar(self):
         if not self.input_text.strip():
             self.result = {
@@ -357,11 +698,81 @@ class ClassifierUI:
             }
             return
 
-        # 1) Intentar como gramática
-        productions = self.parser.parse_grammar(self.input_text)
-        if productions:
-            try:
-                path = self.visualizer.generate_diagram(productions)
+        # El render de Graphviz se hace en segundo plano; el resultado llega
+        # como JOB_DONE_EVENT y se muestra en finish_diagram
+        self.cancel_diagram()
+        try:
+            # Gramática o, si no hay producciones, autómata / MT: lo decide
+            # el trabajo, que también arma el GrammarIR
+            self.diagram_job = self.jobs.submit(
+                "diagram", generate_diagram, self.visualizer, self.grammar.snapshot(self.buffer)
+            )
+        except Exception as e:
+            self.result = {
+                "type": "Error",
+                "description": "Error al generar diagrama",
+                "explanation": f"Error: {str(e)}",
+                "steps": [f"Error al generar diagrama: {str(e)}"],
+            }
+            return
+
+        self.result = {
+            "type": "Información",
+            "description": "Generando diagrama...",
+            "explanation": (
+                "Generando el diagrama con Graphviz en segundo plano...\n"
+                "Pulse ESC para cancelar."
+            ),
+            "steps": [],
+        }
+
+    def poll_jobs(self):
+        """
+        Recoge los trabajos terminados cuyo JOB_DONE_EVENT no llegó a esta
+        escena (p. ej. porque terminaron mientras se mostraba el menú).
+        """
+        for job in (self.diagram_job, self.classify_job, self.live_job, self.export_job):
+            if job is not None and job.done():
+                event = job.done_event()
+                if event is not None:
+                    self.dirty.add_all()
+                    self.finish_job(event)
+
+    def finish_job(self, event):
+        # Cada finish_* ignora los trabajos ya atendidos o reemplazados
+        if event.job.kind == "diagram":
+            self.finish_diagram(event)
+        elif event.job.kind == "classify":
+            self.finish_classify(event)
+        elif event.job.kind == "live":
+            self.finish_live_analysis(event)
+        elif event.job.kind == "export":
+            self.finish_export(event)
+
+    def cancel_diagram(self):
+        """Cancela el diagrama en curso. Devuelve True si había uno."""
+        job = self.diagram_job
+        if job is None or job.done():
+            return False
+        job.cancel()
+        self.diagram_job = None
+        self.result = {
+            "type": "Información",
+            "description": "Diagrama cancelado",
+            "explanation": "Se canceló la generación del diagrama.",
+            "steps": [],
+        }
+        return True
+
+    def finish_diagram(self, event):
+        """Muestra el resultado de un diagrama terminado en segundo plano."""
+        if event.job is not self.diagram_job:
+            return  # resultado de un trabajo ya reemplazado
+        self.diagram_job = None
+        kind, path, e = event.result
+
+        if kind == "grammar":
+            if e is None:
                 self.result = {
                     "type": "Información",
                     "description": "Diagrama de gramática generado",
@@ -371,7 +782,7 @@ class ClassifierUI:
                         f"Diagrama de derivaciones generado en: {path}",
                     ],
                 }
-            except Exception as e:
+            else:
                 self.result = {
                     "type": "Error",
                     "description": "Error al generar diagrama de gramática",
@@ -380,9 +791,7 @@ class ClassifierUI:
                 }
             return
 
-        # 2) Si no hay producciones, intentar como autómata / MT
-        try:
-            path = self.visualizer.generate_automaton_diagram_from_text(self.input_text)
+        if e is None:
             self.result = {
                 "type": "Información",
                 "description": "Diagrama de autómata / Máquina de Turing generado",
@@ -393,7 +802,7 @@ class ClassifierUI:
                     f"Se generó un grafo de estados usando Graphviz en: {path}",
                 ],
             }
-        except Exception as e:
+        else:
             self.result = {
                 "type": "Error",
                 "description": "Error al generar diagrama de autómata / MT",
@@ -401,43 +810,59 @@ class ClassifierUI:
                 "steps": [f"Error al generar diagrama de autómata: {str(e)}"],
             }
 
-
     def export_pdf(self):
+        # La clasificación y el PDF se arman en segundo plano, a partir de
+        # una copia del editor; el resultado llega en finish_export
+        if self.export_job is not None and not self.export_job.done():
+            return
         try:
-            # Intentar parsear como gramática
-            productions = self.parser.parse_grammar(self.input_text)
-
-            if productions:
-                classification_result = self.classifier.classify(productions)
-            else:
-                # Si no hay producciones, se trata como autómata / MT
-                classification_result = self.classifier.classify_automaton_from_text(
-                    self.input_text
-                )
-
-            filename = self.report_generator.generate_pdf(
-                classification_result,
-                grammar_text=self.input_text
-            )
-
-            # Actualiza el resultado mostrado en pantalla
+            report_generator = self.report_generator
+        except Exception as e:
             self.result = {
-                "type": classification_result["type"],
-                "description": f"Reporte exportado correctamente como {filename}",
-                "explanation": classification_result["explanation"],
-                "steps": classification_result["steps"] + [
-                    f"Reporte PDF generado: {filename}"
-                ],
+                "type": "Error",
+                "description": "Error al generar PDF",
+                "explanation": f"Error: {str(e)}",
+                "steps": [f"Error al generar PDF: {str(e)}"],
             }
-
-        except Exception as e:
+            return
+        self.export_job = self.jobs.submit(
+            "export",
+            export_report,
+            self.classifier,
+            report_generator,
+            self.grammar.snapshot(self.buffer, with_text=True),
+        )
+        self.result = {
+            "type": "Información",
+            "description": "Exportando reporte...",
+            "explanation": "Generando el reporte PDF en segundo plano...",
+            "steps": [],
+        }
+
+    def finish_export(self, event):
+        if event.job is not self.export_job:
+            return
+        self.export_job = None
+        e = event.error
+        if e is not None:
             self.result = {
                 "type": "Error",
                 "description": "Error al generar PDF",
                 "explanation": f"Error: {str(e)}",
                 "steps": [f"Error al generar PDF: {str(e)}"],
             }
+            return
 
+        classification_result, filename = event.result
+        # Actualiza el resultado mostrado en pantalla
+        self.result = {
+            "type": classification_result["type"],
+            "description": f"Reporte exportado correctamente como {filename}",
+            "explanation": classification_result["explanation"],
+            "steps": classification_result["steps"] + [
+                f"Reporte PDF generado: {filename}"
+            ],
+        }
 
     def load_example(self):
         example = [
@@ -448,6 +873,7 @@ class ClassifierUI:
         self.input_text = "\n".join(example)
         self.cursor_pos = len(self.input_text)
         self.selection_start = None
+        self.scroll_to_caret()
 
     def compare_grammars(self):
         """
@@ -500,7 +926,8 @@ class ClassifierUI:
         width = self.screen.get_width()
 
         # Título
-        title = self.ui_font_title.render(
+        title = render_text(
+            self.ui_font_title,
             "Clasificador de gramáticas - Jerarquía de Chomsky",
             True,
             (255, 255, 255),
@@ -515,11 +942,11 @@ class ClassifierUI:
             "Ingrese su gramática o descripción de autómata en el cuadro de abajo.",
             "Formato de producción: Variable -> símbolos ",
             "Ejemplo: S -> aSB | ab | ε",
-            "Atajos: F1 = Clasificar, F2 = Cargar ejemplo, ESC = Volver al menú",
+            "Atajos: F1 = Clasificar, F2 = Cargar ejemplo, F3 = Análisis en vivo, ESC = Volver al menú / cancelar diagrama",
             "Edición: Ctrl+A/C/V, flechas, Enter, Tab.",
         ]
         for i, line in enumerate(info_lines):
-            text = self.ui_font_small.render(line, True, (210, 210, 210))
+            text = render_text(self.ui_font_small, line, True, (210, 210, 210))
             self.screen.blit(text, (60, 80 + i * 18))
 
         # Área de entrada
@@ -534,7 +961,7 @@ class ClassifierUI:
             pygame.draw.rect(self.screen, color, rect, border_radius=8)
             pygame.draw.rect(self.screen, (255, 255, 255), rect, 2, border_radius=8)
 
-            text = self.ui_font_button.render(button["text"], True, (255, 255, 255))
+            text = render_text(self.ui_font_button, button["text"], True, (255, 255, 255))
             self.screen.blit(
                 text,
                 (
@@ -549,28 +976,20 @@ class ClassifierUI:
         )
         pygame.draw.rect(self.screen, (80, 80, 80), self.output_rect, 2, border_radius=6)
 
-        result_title_font = pygame.font.Font(None, 28)
-        result_title = result_title_font.render(
-            "Resultado del análisis:", True, (0, 0, 0)
+        result_title_font = get_font(None, 28)
+        result_title = render_text(
+            result_title_font, "Resultado del análisis:", True, (0, 0, 0)
         )
         self.screen.blit(
             result_title, (self.output_rect.x + 10, self.output_rect.y + 10)
         )
 
         if self.result:
-            text_area = self.output_rect.copy()
-            text_area.x += 10
-            text_area.y += 40
-            text_area.width -= 20
-            text_area.height -= 50
-
-            explanation = self.result.get("explanation", "")
-            self.draw_text_block(
-                explanation, text_area, self.result_font, (0, 0, 0)
-            )
+            self.draw_result_text()
         else:
-            default_font = pygame.font.Font(None, 22)
-            default_text = default_font.render(
+            default_font = get_font(None, 22)
+            default_text = render_text(
+                default_font,
                 "Ingrese una gramática o autómata y haga clic en 'Clasificar'.",
                 True,
                 (120, 120, 120),
@@ -583,6 +1002,10 @@ class ClassifierUI:
                 ),
             )
 
+        # Barra de estado (análisis en vivo)
+        status = render_text(self.ui_font_small, self.status_text(), True, (230, 230, 150))
+        self.screen.blit(status, (self.status_rect.x, self.status_rect.y))
+
     # --- Dibujo del editor ---
 
     def draw_editor_text(self):
@@ -590,81 +1013,60 @@ class ClassifierUI:
         font = self.editor_font
         line_height = font.get_linesize()
 
-        lines = self.input_text.split("\n")
+        lines = self.buffer.lines
+        total = lines.line_count()
+        visible = self.visible_editor_lines()
+        cursor_line = lines.line_of(self.cursor_pos)
+        scrollable = total > visible
 
-        y = rect.y + 4
-        index_counter = 0  # para saber dónde está cada carácter
-
-        for line in lines:
-            if y + line_height > rect.bottom:
-                break
+        # Solo se recorren las líneas dentro de la ventana visible
+        text_area = rect.inflate(-4, -4)
+        if scrollable:
+            text_area.width -= 12
+        previous_clip = self.screen.get_clip()
+        self.screen.set_clip(text_area.clip(previous_clip))
 
-            # Dibujar texto
-            text_surface = font.render(line, True, (0, 0, 0))
-            self.screen.blit(text_surface, (rect.x + 4, y))
+        y = rect.y + 4
+        first = self.editor_scroll
+        for i in range(first, min(total, first + visible)):
+            # Dibujar texto (reutilizando la superficie si la línea no cambió)
+            line = self.buffer.line_text(i)
+            self.screen.blit(self.editor_lines.surface(font, line), (rect.x + 4, y))
 
             # Si el cursor está en esta línea, se calcula su posición
-            start_index = index_counter
-            end_index = index_counter + len(line)
-            if start_index <= self.cursor_pos <= end_index:
-                if self.cursor_visible and self.active_input:
-                    col = self.cursor_pos - start_index
-                    caret_x = rect.x + 4 + font.size(line[:col])[0]
-                    caret_y1 = y
-                    caret_y2 = y + line_height - 2
-                    pygame.draw.line(
-                        self.screen,
-                        (0, 0, 0),
-                        (caret_x, caret_y1),
-                        (caret_x, caret_y2),
-                        2,
-                    )
-
-            index_counter += len(line) + 1  # +1 por el '\n'
-            y += line_height
-
-    def draw_text_block(self, text, rect, font, color):
-        # 1) Normalizar unicode para evitar símbolos rotos
-        import unicodedata
-
-        text = unicodedata.normalize("NFKC", text)
-
-        # 2) Reemplazar saltos raros
-        text = text.replace("\r\n", "\n").replace("\r", "\n")
+            if i == cursor_line and self.cursor_visible and self.active_input:
+                col = self.cursor_pos - lines.line_start(i)
+                caret_x = rect.x + 4 + self.editor_lines.caret_x(font, line, col)
+                caret_y1 = y
+                caret_y2 = y + line_height - 2
+                pygame.draw.line(
+                    self.screen,
+                    (0, 0, 0),
+                    (caret_x, caret_y1),
+                    (caret_x, caret_y2),
+                    2,
+                )
 
-        # 3) Limpiar caracteres no imprimibles que generan �
-        cleaned = ""
-        for ch in text:
-            if ch == "\n" or ch == "\t" or ch == " ":
-                cleaned += ch
-            elif ord(ch) >= 32:  # caracteres imprimibles
-                cleaned += ch
-            # Si no, se omite.
+            y += line_height
 
-        text = cleaned
+        self.screen.set_clip(previous_clip)
 
-        # 4) Word wrapping básico
-        words = text.split(" ")
-        lines = []
-        current = ""
+        # Barra de desplazamiento
+        if scrollable:
+            self.draw_scrollbar("editor")
 
-        for word in words:
-            test = (current + " " + word).strip()
-            w, _ = font.size(test)
-            if w <= rect.width:
-                current = test
-            else:
-                lines.append(current)
-                current = word
+    def draw_result_text(self):
+        area = self.pane_area("output")
+        font = self.result_font
+        line_height = font.get_linesize()
+        lines = self.result_layout()
+        first, visible, total = self.pane_lines("output")
 
-        if current:
-            lines.append(current)
+        y = area.y
+        for line in lines[first : first + visible]:
+            if line:
+                self.screen.blit(self.result_lines.surface(font, line), (area.x, y))
+            y += line_height
 
-        # 5) Dibujar líneas dentro del rectángulo
-        y = rect.y
-        for line in lines:
-            if y + font.get_linesize() > rect.bottom:
-                break
-            surf = font.render(line, True, color)
-            self.screen.blit(surf, (rect.x, y))
-            y += font.get_linesize()
+        if total > visible:
+            self.draw_scrollbar("output")
@@ -0,0 +1,98 @@
+import pygame
+
+from profiler import timer
+
+
+class FrameScheduler:
+    """
+    Decide cuánto esperar entre cuadros.
+
+    Mientras llegan eventos se trabaja a `active_fps`. Pasados `idle_after`
+    segundos sin eventos, el bucle se bloquea en pygame.event.wait hasta el
+    próximo evento (o como mucho 1 / `idle_fps` s, para que los temporizadores
+    como el parpadeo del cursor o el reloj del quiz sigan avanzando), así que
+    una ventana quieta casi no usa CPU y aun así responde al instante.
+    """
+
+    def __init__(self, active_fps=60, idle_fps=10, idle_after=0.5):
+        self.active_fps = active_fps
+        self.idle_timeout = int(1000 / idle_fps)
+        self.idle_after = int(idle_after * 1000)
+        self.clock = pygame.time.Clock()
+        self.last_activity = pygame.time.get_ticks()
+
+    def wake(self):
+        """Mantiene el ritmo activo (p. ej. mientras una escena reparte trabajo entre cuadros)."""
+        self.last_activity = pygame.time.get_ticks()
+
+    @property
+    def idle(self):
+        return pygame.time.get_ticks() - self.last_activity > self.idle_after
+
+    def events(self):
+        """Espera lo que corresponda y devuelve los eventos pendientes."""
+        if self.idle:
+            first = pygame.event.wait(self.idle_timeout)
+            if first.type == pygame.NOEVENT:
+                return []
+            events = [first] + pygame.event.get()
+            # El reloj no debe contar el tiempo dormido como un cuadro lento
+            self.clock.tick()
+        else:
+            self.clock.tick(self.active_fps)
+            events = pygame.event.get()
+
+        if events:
+            self.last_activity = pygame.time.get_ticks()
+        return events
+
+
+class DirtyRegions:
+    """
+    Zonas de la pantalla que cambiaron desde el último cuadro.
+
+    El bucle redibuja la escena recortada (set_clip) a estas zonas y solo
+    las envía a la pantalla con pygame.display.update(rects). Si no hay
+    ninguna, no se dibuja nada.
+    """
+
+    def __init__(self, screen_rect):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.rects = [self.screen_rect.copy()]
+
+    def add(self, rect):
+        rect = self.screen_rect.clip(rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def add_all(self):
+        self.rects = [self.screen_rect.copy()]
+
+    def add_hover(self, rects, event):
+        """Marca los rects en los que el mouse entró o de los que salió."""
+        previous = (event.pos[0] - event.rel[0], event.pos[1] - event.rel[1])
+        for rect in rects:
+            if rect.collidepoint(previous) != rect.collidepoint(event.pos):
+                self.add(rect.inflate(4, 4))
+
+    def take(self):
+        rects = self.rects
+        self.rects = []
+        return rects
+
+
+def present(screen, dirty, draw):
+    """
+    Redibuja con `draw()` solo las zonas sucias y las actualiza en pantalla.
+    Devuelve False si no había nada que dibujar.
+    """
+    rects = dirty.take()
+    if not rects:
+        return False
+    with timer("draw"):
+        screen.set_clip(rects[0].unionall(rects[1:]))
+        draw()
+        screen.set_clip(None)
+    with timer("flip"):
+        pygame.display.update(rects)
+    return True
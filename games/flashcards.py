@@ -1,10 +1,15 @@
 import pygame
 import random
 
+from frame_scheduler import DirtyRegions
+from render_cache import get_font, render_text
+
 class FlashcardGame:
     def __init__(self, screen, assets):
         self.screen = screen
         self.assets = assets
+        self._wrapped = {}
+        self.dirty = DirtyRegions(screen.get_rect())
         self.cards = self.load_flashcards()
         self.current_card = 0
         self.show_answer = False
@@ -254,6 +259,12 @@ class FlashcardGame:
         ]
     
     def handle_event(self, event):
+        if event.type == pygame.MOUSEMOTION:
+            # Mover el mouse solo cambia el resaltado de los botones
+            self.dirty.add_hover([button["rect"] for button in self.buttons], event)
+        else:
+            self.dirty.add_all()
+
         if event.type == pygame.MOUSEBUTTONDOWN:
             for button in self.buttons:
                 if button["rect"].collidepoint(event.pos):
@@ -306,21 +317,21 @@ class FlashcardGame:
         self.screen.fill((30, 30, 60))
         
         # Título
-        title_font = pygame.font.Font(None, 48)
-        title = title_font.render("🎓 FLASHCARDS - Chomsky Hierarchy (80 cards)", True, (255, 255, 255))
+        title_font = get_font(None, 48)
+        title = render_text(title_font, "🎓 FLASHCARDS - Chomsky Hierarchy (80 cards)", True, (255, 255, 255))
         self.screen.blit(title, (self.screen.get_width() // 2 - title.get_width() // 2, 50))
         
         # Progreso
-        progress_font = pygame.font.Font(None, 24)
-        progress = progress_font.render(f"Card {self.current_card + 1}/{len(self.cards)}", True, (200, 200, 200))
+        progress_font = get_font(None, 24)
+        progress = render_text(progress_font, f"Card {self.current_card + 1}/{len(self.cards)}", True, (200, 200, 200))
         self.screen.blit(progress, (self.screen.get_width() // 2 - progress.get_width() // 2, 120))
         
         # Categoría actual
-        category_font = pygame.font.Font(None, 20)
+        category_font = get_font(None, 20)
         categories = ["Conceptos Básicos", "Tipo 3 - Regular", "Tipo 2 - Libre Contexto", 
                      "Tipo 1 - Sensible Contexto", "Tipo 0 - Recursivamente Enumerable", "Autómatas"]
         category_idx = min(self.current_card // 15, 5)
-        category_text = category_font.render(f"Categoría: {categories[category_idx]}", True, (150, 200, 255))
+        category_text = render_text(category_font, f"Categoría: {categories[category_idx]}", True, (150, 200, 255))
         self.screen.blit(category_text, (self.screen.get_width() // 2 - category_text.get_width() // 2, 150))
         
         # Carta (flashcard)
@@ -333,26 +344,26 @@ class FlashcardGame:
         
         if not self.show_answer:
             # Mostrar pregunta
-            question_font = pygame.font.Font(None, 28)
+            question_font = get_font(None, 28)
             question_text = self.wrap_text(card["question"], question_font, card_rect.width - 40)
             
             for i, line in enumerate(question_text):
-                text_surf = question_font.render(line, True, (0, 0, 0))
+                text_surf = render_text(question_font, line, True, (0, 0, 0))
                 self.screen.blit(text_surf, (card_rect.centerx - text_surf.get_width() // 2, 
                                            card_rect.top + 50 + i * 35))
             
             # Indicador de click
-            hint_font = pygame.font.Font(None, 20)
-            hint = hint_font.render("Click 'Mostrar Respuesta' o presiona ESPACIO", True, (100, 100, 100))
+            hint_font = get_font(None, 20)
+            hint = render_text(hint_font, "Click 'Mostrar Respuesta' o presiona ESPACIO", True, (100, 100, 100))
             self.screen.blit(hint, (card_rect.centerx - hint.get_width() // 2, card_rect.bottom - 40))
         
         else:
             # Mostrar respuesta
-            answer_font = pygame.font.Font(None, 24)
+            answer_font = get_font(None, 24)
             answer_text = self.wrap_text(card["answer"], answer_font, card_rect.width - 40)
             
             for i, line in enumerate(answer_text):
-                text_surf = answer_font.render(line, True, (0, 100, 0))
+                text_surf = render_text(answer_font, line, True, (0, 100, 0))
                 self.screen.blit(text_surf, (card_rect.centerx - text_surf.get_width() // 2, 
                                            card_rect.top + 50 + i * 30))
         
@@ -362,32 +373,37 @@ class FlashcardGame:
             pygame.draw.rect(self.screen, color, button["rect"], border_radius=8)
             pygame.draw.rect(self.screen, (50, 50, 50), button["rect"], 2, border_radius=8)
             
-            button_font = pygame.font.Font(None, 20)
-            text_surf = button_font.render(button["text"], True, (0, 0, 0))
+            button_font = get_font(None, 20)
+            text_surf = render_text(button_font, button["text"], True, (0, 0, 0))
             self.screen.blit(text_surf, (button["rect"].centerx - text_surf.get_width() // 2, 
                                        button["rect"].centery - text_surf.get_height() // 2))
         
         # Atajos de teclado
-        shortcuts_font = pygame.font.Font(None, 18)
+        shortcuts_font = get_font(None, 18)
         shortcuts = [
             "ESPACIO: Mostrar/Ocultar respuesta",
             "FLECHAS: Navegar  |  R: Aleatorio  |  ESC: Menú"
         ]
         
         for i, shortcut in enumerate(shortcuts):
-            text = shortcuts_font.render(shortcut, True, (150, 150, 150))
+            text = render_text(shortcuts_font, shortcut, True, (150, 150, 150))
             self.screen.blit(text, (self.screen.get_width() // 2 - text.get_width() // 2, 750))
     
     def wrap_text(self, text, font, max_width):
+        # El texto de cada carta se parte una sola vez, no en cada cuadro
+        key = (text, font, max_width)
+        cached = self._wrapped.get(key)
+        if cached is not None:
+            return cached
+
         words = text.split(' ')
         lines = []
         current_line = []
         
         for word in words:
             test_line = ' '.join(current_line + [word])
-            test_surf = font.render(test_line, True, (0, 0, 0))
             
-            if test_surf.get_width() <= max_width:
+            if font.size(test_line)[0] <= max_width:
                 current_line.append(word)
             else:
                 lines.append(' '.join(current_line))
@@ -396,24 +412,5 @@ class FlashcardGame:
         if current_line:
             lines.append(' '.join(current_line))
         
+        self._wrapped[key] = lines
         return lines
-    
-    def run(self):
-        clock = pygame.time.Clock()
-        running = True
-        
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return "quit"
-                
-                result = self.handle_event(event)
-                if result == "menu":
-                    running = False
-            
-            self.update()
-            self.draw()
-            pygame.display.flip()
-            clock.tick(60)
-        
-        return "menu"
\ No newline at end of file
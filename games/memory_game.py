@@ -1,11 +1,17 @@
 import pygame
 import random
 
+from frame_scheduler import DirtyRegions
+from render_cache import get_font, render_text
+
 
 class MemoryGame:
     def __init__(self, screen, assets):
         self.screen = screen
         self.assets = assets
+        self._wrapped = {}
+        self.hide_at = None  # ms en que se vuelven a tapar dos cartas distintas
+        self.dirty = DirtyRegions(screen.get_rect())
         self.cards = self.create_card_pairs()
         self.setup_game()
 
@@ -69,6 +75,7 @@ class MemoryGame:
         self.matched_pairs = []
         self.moves = 0
         self.game_won = False
+        self.hide_at = None
         self.cards_per_row = 8
 
         self.card_rects = []
@@ -87,6 +94,10 @@ class MemoryGame:
                 self.card_rects.append(pygame.Rect(x, y, card_width, card_height))
 
     def handle_event(self, event):
+        # Las cartas no reaccionan al paso del mouse
+        if event.type != pygame.MOUSEMOTION:
+            self.dirty.add_all()
+
         if event.type == pygame.MOUSEBUTTONDOWN and not self.game_won:
             for i, rect in enumerate(self.card_rects):
                 if i < len(self.cards) and rect.collidepoint(event.pos) and i not in self.matched_pairs and i not in self.selected_cards:
@@ -103,11 +114,7 @@ class MemoryGame:
                                 if len(self.matched_pairs) == len(self.cards):
                                     self.game_won = True
                             else:
-                                pygame.time.set_timer(pygame.USEREVENT, 1000)
-
-        elif event.type == pygame.USEREVENT:
-            self.selected_cards = []
-            pygame.time.set_timer(pygame.USEREVENT, 0)
+                                self.hide_at = pygame.time.get_ticks() + 1000
 
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
@@ -115,20 +122,28 @@ class MemoryGame:
             elif event.key == pygame.K_r and self.game_won:
                 self.setup_game()
 
+    def update(self):
+        # Con un temporizador propio (y no un evento de pygame) las cartas se
+        # tapan aunque se haya salido al menú mientras estaban a la vista
+        if self.hide_at is not None and pygame.time.get_ticks() >= self.hide_at:
+            self.selected_cards = []
+            self.hide_at = None
+            self.dirty.add_all()
+
     def draw(self):
         self.screen.fill((40, 40, 80))
 
         # Título
-        title_font = pygame.font.Font(None, 48)
-        title = title_font.render("Juego de memoria - 40 pares", True, (255, 255, 255))
+        title_font = get_font(None, 48)
+        title = render_text(title_font, "Juego de memoria - 40 pares", True, (255, 255, 255))
         self.screen.blit(title, (self.screen.get_width() // 2 - title.get_width() // 2, 30))
 
         # Info
-        info_font = pygame.font.Font(None, 24)
-        moves_text = info_font.render(f"Movimientos: {self.moves}", True, (200, 200, 200))
-        pairs_text = info_font.render(f"Pares: {len(self.matched_pairs)//2}/40", True, (200, 200, 200))
+        info_font = get_font(None, 24)
+        moves_text = render_text(info_font, f"Movimientos: {self.moves}", True, (200, 200, 200))
+        pairs_text = render_text(info_font, f"Pares: {len(self.matched_pairs)//2}/40", True, (200, 200, 200))
         progress = len(self.matched_pairs) / len(self.cards) * 100
-        progress_text = info_font.render(f"Progreso: {progress:.1f}%", True, (200, 200, 200))
+        progress_text = render_text(info_font, f"Progreso: {progress:.1f}%", True, (200, 200, 200))
 
         self.screen.blit(moves_text, (50, 80))
         self.screen.blit(pairs_text, (self.screen.get_width() // 2 - 50, 80))
@@ -145,12 +160,12 @@ class MemoryGame:
                 pygame.draw.rect(self.screen, (50, 50, 50), rect, 2, border_radius=8)
 
                 # Tipo
-                type_font = pygame.font.Font(None, 16)
-                type_text = type_font.render(card["type"], True, (0, 0, 0))
+                type_font = get_font(None, 16)
+                type_text = render_text(type_font, card["type"], True, (0, 0, 0))
                 self.screen.blit(type_text, (rect.centerx - type_text.get_width() // 2, rect.top + 8))
 
                 # Descripción
-                desc_font = pygame.font.Font(None, 12)
+                desc_font = get_font(None, 12)
                 desc_lines = self.wrap_text(card["description"], desc_font, rect.width - 10)
 
                 # Limitar número de líneas para que el texto no se salga
@@ -158,7 +173,7 @@ class MemoryGame:
                 desc_lines = desc_lines[:max_lines]
 
                 for j, line in enumerate(desc_lines):
-                    desc_text = desc_font.render(line, True, (0, 0, 0))
+                    desc_text = render_text(desc_font, line, True, (0, 0, 0))
                     self.screen.blit(
                         desc_text,
                         (
@@ -173,8 +188,8 @@ class MemoryGame:
                 inner = rect.inflate(-15, -15)
                 pygame.draw.rect(self.screen, (80, 80, 160), inner, border_radius=5)
 
-                question_font = pygame.font.Font(None, 24)
-                question = question_font.render("?", True, (200, 200, 255))
+                question_font = get_font(None, 24)
+                question = render_text(question_font, "?", True, (200, 200, 255))
                 self.screen.blit(
                     question,
                     (
@@ -191,8 +206,8 @@ class MemoryGame:
             overlay.fill((0, 0, 0, 150))
             self.screen.blit(overlay, (0, 0))
 
-            win_font = pygame.font.Font(None, 64)
-            win_text = win_font.render("¡GANASTE!", True, (255, 255, 0))
+            win_font = get_font(None, 64)
+            win_text = render_text(win_font, "¡GANASTE!", True, (255, 255, 0))
             self.screen.blit(
                 win_text,
                 (
@@ -201,10 +216,10 @@ class MemoryGame:
                 ),
             )
 
-            stats_font = pygame.font.Font(None, 36)
-            stats_text = stats_font.render(f"Movimientos: {self.moves}", True, (255, 255, 255))
+            stats_font = get_font(None, 36)
+            stats_text = render_text(stats_font, f"Movimientos: {self.moves}", True, (255, 255, 255))
             efficiency = (40 / max(1, self.moves)) * 100
-            efficiency_text = stats_font.render(f"Eficiencia: {efficiency:.1f}%", True, (255, 255, 255))
+            efficiency_text = render_text(stats_font, f"Eficiencia: {efficiency:.1f}%", True, (255, 255, 255))
 
             self.screen.blit(
                 stats_text,
@@ -221,9 +236,9 @@ class MemoryGame:
                 ),
             )
 
-            restart_font = pygame.font.Font(None, 24)
-            restart_text = restart_font.render(
-                "Presiona R para reiniciar o ESC para volver al menú", True, (230, 230, 230)
+            restart_font = get_font(None, 24)
+            restart_text = render_text(
+                restart_font, "Presiona R para reiniciar o ESC para volver al menú", True, (230, 230, 230)
             )
             self.screen.blit(
                 restart_text,
@@ -234,14 +249,19 @@ class MemoryGame:
             )
 
     def wrap_text(self, text, font, max_width):
+        # El texto de cada carta se parte una sola vez, no en cada cuadro
+        key = (text, font, max_width)
+        cached = self._wrapped.get(key)
+        if cached is not None:
+            return cached
+
         words = text.split(" ")
         lines = []
         current_line = []
 
         for word in words:
             test_line = " ".join(current_line + [word])
-            surf = font.render(test_line, True, (0, 0, 0))
-            if surf.get_width() <= max_width:
+            if font.size(test_line)[0] <= max_width:
                 current_line.append(word)
             else:
                 if current_line:
@@ -251,23 +271,5 @@ class MemoryGame:
         if current_line:
             lines.append(" ".join(current_line))
 
+        self._wrapped[key] = lines
         return lines
-
-    def run(self):
-        clock = pygame.time.Clock()
-        running = True
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return "quit"
-
-                result = self.handle_event(event)
-                if result == "menu":
-                    running = False
-
-            self.draw()
-            pygame.display.flip()
-            clock.tick(60)
-
-        return "menu"
@@ -2,11 +2,17 @@ import pygame
 import random
 import time
 
+from frame_scheduler import DirtyRegions
+from render_cache import get_font, render_text
+
 
 class QuizRaceGame:
     def __init__(self, screen, assets):
         self.screen = screen
         self.assets = assets
+        self.dirty = DirtyRegions(screen.get_rect())
+        self._shown_state = None
+        self.paused_at = None
         self.questions = self.load_questions()
         self.setup_game()
 
@@ -206,6 +212,12 @@ class QuizRaceGame:
             self.option_buttons.append(rect)
 
     def handle_event(self, event):
+        if event.type == pygame.MOUSEMOTION:
+            if not self.game_over:
+                self.dirty.add_hover(self.option_buttons, event)
+        else:
+            self.dirty.add_all()
+
         if event.type == pygame.MOUSEBUTTONDOWN and not self.game_over and not self.show_feedback:
             for i, rect in enumerate(self.option_buttons):
                 if rect.collidepoint(event.pos):
@@ -232,6 +244,17 @@ class QuizRaceGame:
             self.score += 10
             self.time_left += 3  # pequeño bonus
 
+    def leave(self):
+        # El reloj se detiene mientras se está en otra escena
+        self.paused_at = time.time()
+
+    def enter(self):
+        if self.paused_at is not None:
+            paused = time.time() - self.paused_at
+            self.start_time += paused
+            self.feedback_timer += paused
+            self.paused_at = None
+
     def update(self):
         current_time = time.time()
         elapsed = current_time - self.start_time
@@ -250,21 +273,28 @@ class QuizRaceGame:
                 if self.current_question >= len(self.questions) or self.questions_answered >= 20:
                     self.game_over = True
 
+        # El reloj se muestra en segundos: solo se redibuja cuando cambia
+        # lo que se ve
+        shown_state = (int(self.time_left), self.show_feedback, self.current_question, self.game_over)
+        if shown_state != self._shown_state:
+            self._shown_state = shown_state
+            self.dirty.add_all()
+
     def draw(self):
         self.screen.fill((60, 40, 80))
 
-        title_font = pygame.font.Font(None, 48)
-        title = title_font.render("Carrera de quiz - Banco de preguntas", True, (255, 255, 255))
+        title_font = get_font(None, 48)
+        title = render_text(title_font, "Carrera de quiz - Banco de preguntas", True, (255, 255, 255))
         self.screen.blit(
             title,
             (self.screen.get_width() // 2 - title.get_width() // 2, 50),
         )
 
-        info_font = pygame.font.Font(None, 24)
-        score_text = info_font.render(f"Puntuación: {self.score}", True, (255, 255, 0))
+        info_font = get_font(None, 24)
+        score_text = render_text(info_font, f"Puntuación: {self.score}", True, (255, 255, 0))
         time_color = (255, 100, 100) if self.time_left < 10 else (100, 255, 100)
-        time_text = info_font.render(f"Tiempo: {int(self.time_left)} s", True, time_color)
-        progress_text = info_font.render(f"Progreso: {self.questions_answered}/20", True, (220, 220, 220))
+        time_text = render_text(info_font, f"Tiempo: {int(self.time_left)} s", True, time_color)
+        progress_text = render_text(info_font, f"Progreso: {self.questions_answered}/20", True, (220, 220, 220))
 
         self.screen.blit(score_text, (50, 120))
         self.screen.blit(time_text, (self.screen.get_width() // 2 - time_text.get_width() // 2, 120))
@@ -273,8 +303,8 @@ class QuizRaceGame:
         if not self.game_over:
             question = self.questions[self.current_question]
 
-            q_font = pygame.font.Font(None, 30)
-            q_surface = q_font.render(question["question"], True, (255, 255, 255))
+            q_font = get_font(None, 30)
+            q_surface = render_text(q_font, question["question"], True, (255, 255, 255))
             self.screen.blit(
                 q_surface,
                 (self.screen.get_width() // 2 - q_surface.get_width() // 2, 180),
@@ -294,8 +324,8 @@ class QuizRaceGame:
                 pygame.draw.rect(self.screen, (50, 50, 50), rect, 2, border_radius=8)
 
                 option_text = f"{i+1}. {question['options'][i]}"
-                option_font = pygame.font.Font(None, 24)
-                option_surf = option_font.render(option_text, True, (0, 0, 0))
+                option_font = get_font(None, 24)
+                option_surf = render_text(option_font, option_text, True, (0, 0, 0))
                 self.screen.blit(
                     option_surf,
                     (
@@ -305,7 +335,7 @@ class QuizRaceGame:
                 )
 
             if self.show_feedback:
-                fb_font = pygame.font.Font(None, 22)
+                fb_font = get_font(None, 22)
                 if self.selected_answer == question["correct"]:
                     fb_text = f"Correcto. +10 puntos - {question['explanation']}"
                     fb_color = (120, 255, 120)
@@ -314,7 +344,7 @@ class QuizRaceGame:
                     fb_text = f"Incorrecto. Correcto: {correct_answer}. {question['explanation']}"
                     fb_color = (255, 150, 150)
 
-                fb_surface = fb_font.render(fb_text, True, fb_color)
+                fb_surface = render_text(fb_font, fb_text, True, fb_color)
                 self.screen.blit(
                     fb_surface,
                     (
@@ -324,15 +354,15 @@ class QuizRaceGame:
                 )
 
         else:
-            result_font = pygame.font.Font(None, 64)
+            result_font = get_font(None, 64)
             if self.score >= 160:
-                result_text = result_font.render("¡Genio!", True, (255, 215, 0))
+                result_text = render_text(result_font, "¡Genio!", True, (255, 215, 0))
             elif self.score >= 120:
-                result_text = result_font.render("¡Excelente!", True, (255, 255, 0))
+                result_text = render_text(result_font, "¡Excelente!", True, (255, 255, 0))
             elif self.score >= 80:
-                result_text = result_font.render("¡Muy bien!", True, (255, 200, 0))
+                result_text = render_text(result_font, "¡Muy bien!", True, (255, 200, 0))
             else:
-                result_text = result_font.render("Buen intento", True, (255, 150, 0))
+                result_text = render_text(result_font, "Buen intento", True, (255, 150, 0))
 
             self.screen.blit(
                 result_text,
@@ -342,10 +372,10 @@ class QuizRaceGame:
                 ),
             )
 
-            score_font = pygame.font.Font(None, 48)
-            score_display = score_font.render(f"Puntuación final: {self.score}", True, (255, 255, 255))
+            score_font = get_font(None, 48)
+            score_display = render_text(score_font, f"Puntuación final: {self.score}", True, (255, 255, 255))
             accuracy = (self.score / max(1, self.questions_answered * 10)) * 100
-            accuracy_text = score_font.render(f"Precisión: {accuracy:.1f}%", True, (255, 255, 255))
+            accuracy_text = render_text(score_font, f"Precisión: {accuracy:.1f}%", True, (255, 255, 255))
 
             self.screen.blit(
                 score_display,
@@ -362,9 +392,9 @@ class QuizRaceGame:
                 ),
             )
 
-            restart_font = pygame.font.Font(None, 24)
-            restart_text = restart_font.render(
-                "Presiona R para reiniciar o ESC para volver al menú", True, (220, 220, 220)
+            restart_font = get_font(None, 24)
+            restart_text = render_text(
+                restart_font, "Presiona R para reiniciar o ESC para volver al menú", True, (220, 220, 220)
             )
             self.screen.blit(
                 restart_text,
@@ -373,23 +403,3 @@ class QuizRaceGame:
                     460,
                 ),
             )
-
-    def run(self):
-        clock = pygame.time.Clock()
-        running = True
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return "quit"
-
-                result = self.handle_event(event)
-                if result == "menu":
-                    running = False
-
-            self.update()
-            self.draw()
-            pygame.display.flip()
-            clock.tick(60)
-
-        return "menu"
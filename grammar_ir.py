@@ -0,0 +1,298 @@
+import hashlib
+import io
+from array import array
+from itertools import accumulate
+
+
+def is_nonterminal(symbol):
+    """Convención de todo el programa: no terminal = letra mayúscula."""
+    return symbol.isupper()
+
+
+def is_variable(lhs):
+    """El lado izquierdo es un solo no terminal (forma de Tipo 2 / Tipo 3)."""
+    return len(lhs) == 1 and is_nonterminal(lhs)
+
+
+# Forma regular de un lado derecho (con un lado izquierdo que es variable)
+REG_EPSILON = 0
+REG_TERMINALS = 1
+REG_RIGHT_LINEAR = 2
+REG_LEFT_LINEAR = 3
+REG_NOT_LINEAR = 4
+# El lado izquierdo no es un solo no terminal (no depende del lado derecho)
+REG_BAD_LHS = 5
+
+
+def regular_code(rhs):
+    """Código REG_* de `rhs` para un lado izquierdo que es un solo no terminal."""
+    if not rhs:
+        return REG_EPSILON
+    nonterminals = [i for i, ch in enumerate(rhs) if is_nonterminal(ch)]
+    if not nonterminals:
+        return REG_TERMINALS
+    if len(nonterminals) == 1 and nonterminals[0] == len(rhs) - 1:
+        return REG_RIGHT_LINEAR
+    if len(nonterminals) == 1 and nonterminals[0] == 0:
+        return REG_LEFT_LINEAR
+    return REG_NOT_LINEAR
+
+
+class _ShapeTable(dict):
+    """lado derecho -> id de forma; una forma nueva se agrega al pedirla."""
+
+    def __init__(self, ir):
+        super().__init__()
+        self.ir = ir
+
+    def __missing__(self, rhs):
+        shape = self[rhs] = self.ir._add_shape(rhs)
+        return shape
+
+
+class GrammarIR:
+    """
+    Representación compacta de una gramática, compartida por el parser,
+    el clasificador y el visualizador.
+
+    - Los lados derechos se guardan seguidos en un único texto plano; la
+      producción i ocupa [rhs_offsets[i], rhs_offsets[i + 1]).
+    - Los lados izquierdos se internan aparte (pueden tener varios caracteres).
+    - Cada lado derecho distinto es una "forma": su largo, su cantidad de no
+      terminales y su código regular (regular_code) se calculan una sola vez
+      y cada producción guarda solo el id de su forma (prod_shape).
+    - Las producciones seguidas con el mismo lado izquierdo forman un bloque
+      (block_lhs, block_starts); con from_pairs / from_productions hay un
+      bloque por lado izquierdo.
+
+    Las producciones quedan agrupadas por lado izquierdo, en el orden en que
+    aparece cada uno, igual que en el diccionario de parse_grammar (salvo con
+    add_production / add_productions, que agregan al final).
+
+    Convención (la misma del clasificador):
+        - No terminal = letra mayúscula (A-Z)
+        - Terminal = cualquier otro símbolo visible
+    """
+
+    def __init__(self):
+        # Símbolos que aparecen en algún lado derecho
+        self.rhs_symbols = set()
+
+        # Tabla de lados izquierdos
+        self.lhs_names = []
+        self.lhs_ids = {}
+        # 1 si el LHS es un solo no terminal (forma de Tipo 2 / Tipo 3)
+        self.lhs_is_variable = bytearray()
+
+        # Formas de lado derecho: largo, cantidad de no terminales y código
+        # regular
+        self.shape_len = array("I")
+        self.shape_nt_count = array("I")
+        self.shape_regular = bytearray()
+
+        # Producciones
+        self.prod_lhs = array("I")
+        self.prod_shape = array("I")
+        self.rhs_offsets = array("I", [0])
+
+        # Bloques de producciones seguidas con el mismo lado izquierdo
+        self.block_lhs = array("I")
+        self.block_starts = array("I")
+
+        # Texto plano de todos los RHS. Mientras se agregan producciones se
+        # escribe en _rhs_writer; al leerlo se pasa a _rhs_flat y el writer
+        # (un buffer UCS-4) se libera.
+        self._rhs_writer = None
+        self._rhs_flat = ""
+        self._fingerprint = None
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_pairs(cls, pairs):
+        """
+        Construye la representación a partir de pares (lhs, rhs), agrupados
+        por lado izquierdo como en parse_grammar.
+        """
+        productions = {}
+        for lhs, rhs in pairs:
+            rhs_list = productions.get(lhs)
+            if rhs_list is None:
+                productions[lhs] = [rhs]
+            else:
+                rhs_list.append(rhs)
+        return cls.from_productions(productions)
+
+    @classmethod
+    def from_productions(cls, productions):
+        """Construye la representación a partir del diccionario de parse_grammar."""
+        ir = cls()
+        shapes = _ShapeTable(ir)
+        prod_lhs = ir.prod_lhs
+        prod_shape = ir.prod_shape
+        offsets = ir.rhs_offsets
+        write = ir._writer().write
+
+        # Un lado izquierdo a la vez: sus producciones se agregan en bloque
+        for lhs, rhs_list in productions.items():
+            lid = ir.intern_lhs(lhs)
+            if not rhs_list:
+                continue
+            ir.block_lhs.append(lid)
+            ir.block_starts.append(len(prod_lhs))
+            prod_lhs.fromlist([lid] * len(rhs_list))
+            prod_shape.fromlist(list(map(shapes.__getitem__, rhs_list)))
+            offsets.fromlist(list(accumulate(map(len, rhs_list), initial=offsets.pop())))
+            write("".join(rhs_list))
+        return ir
+
+    @classmethod
+    def coerce(cls, productions):
+        """Acepta un GrammarIR, un diccionario o un iterable de pares."""
+        if isinstance(productions, cls):
+            return productions
+        if isinstance(productions, dict):
+            return cls.from_productions(productions)
+        return cls.from_pairs(productions)
+
+    def intern_lhs(self, lhs):
+        lid = self.lhs_ids.get(lhs)
+        if lid is None:
+            lid = len(self.lhs_names)
+            self.lhs_names.append(lhs)
+            self.lhs_ids[lhs] = lid
+            self.lhs_is_variable.append(1 if is_variable(lhs) else 0)
+        return lid
+
+    def add_production(self, lhs, rhs):
+        self.add_productions(((lhs, rhs),))
+
+    def add_productions(self, pairs):
+        """
+        Agrega los pares (lhs, rhs) al final, en el orden dado. Cada lado
+        derecho distinto se analiza una sola vez.
+        """
+        shapes = _ShapeTable(self)
+        lhs_ids = self.lhs_ids
+        prod_lhs = self.prod_lhs
+        prod_shape = self.prod_shape
+        offsets = self.rhs_offsets
+        write = self._writer().write
+        end = offsets[-1]
+        last = self.block_lhs[-1] if self.block_lhs else None
+
+        for lhs, rhs in pairs:
+            lid = lhs_ids.get(lhs)
+            if lid is None:
+                lid = self.intern_lhs(lhs)
+            if lid != last:
+                last = lid
+                self.block_lhs.append(lid)
+                self.block_starts.append(len(prod_lhs))
+            prod_lhs.append(lid)
+            prod_shape.append(shapes[rhs])
+            end += len(rhs)
+            offsets.append(end)
+            write(rhs)
+
+    def _writer(self):
+        if self._rhs_writer is None:
+            self._rhs_writer = io.StringIO()
+            self._rhs_writer.write(self._rhs_flat)
+        self._rhs_flat = None
+        self._fingerprint = None
+        return self._rhs_writer
+
+    def _add_shape(self, rhs):
+        self.rhs_symbols.update(rhs)
+        self.shape_len.append(len(rhs))
+        self.shape_nt_count.append(sum(map(is_nonterminal, rhs)))
+        self.shape_regular.append(regular_code(rhs))
+        return len(self.shape_len) - 1
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self.prod_lhs)
+
+    def __bool__(self):
+        return len(self.prod_lhs) > 0
+
+    def lhs_text(self, i):
+        return self.lhs_names[self.prod_lhs[i]]
+
+    def rhs_len(self, i):
+        return self.rhs_offsets[i + 1] - self.rhs_offsets[i]
+
+    def _flat_text(self):
+        if self._rhs_flat is None:
+            self._rhs_flat = self._rhs_writer.getvalue()
+            self._rhs_writer = None
+        return self._rhs_flat
+
+    def rhs_text(self, i):
+        return self._flat_text()[self.rhs_offsets[i]:self.rhs_offsets[i + 1]]
+
+    def occurs_in_rhs(self, ch):
+        """Indica si el símbolo `ch` aparece en algún lado derecho."""
+        return ch in self.rhs_symbols
+
+    def iter_blocks(self):
+        """Genera (id de lado izquierdo, inicio, fin) de cada bloque."""
+        ends = self.block_starts[1:]
+        ends.append(len(self.prod_lhs))
+        return zip(self.block_lhs, self.block_starts, ends)
+
+    def iter_grouped(self):
+        """Genera (lhs, lista de lados derechos) de cada bloque, como dict.items()."""
+        names = self.lhs_names
+        offsets = self.rhs_offsets
+        flat = self._flat_text()
+        for lid, start, end in self.iter_blocks():
+            yield names[lid], [
+                flat[a:b] for a, b in zip(offsets[start:end], offsets[start + 1 : end + 1])
+            ]
+
+    def iter_productions(self):
+        """Genera los pares (lhs, rhs) como strings, en orden de inserción."""
+        names = self.lhs_names
+        offsets = self.rhs_offsets
+        flat = self._flat_text()
+        start = 0
+        for lid, end in zip(self.prod_lhs, offsets[1:]):
+            yield names[lid], flat[start:end]
+            start = end
+
+    def fingerprint(self):
+        """
+        Hash canónico de las producciones (en orden). No depende del formato
+        del texto original: espacios, comentarios, "|" frente a líneas
+        separadas o ε / lambda / λ producen el mismo valor.
+        """
+        if self._fingerprint is None:
+            # Cada campo va precedido de su largo, así que ningún contenido
+            # (ni siquiera separadores de control) puede hacer que dos
+            # gramáticas distintas produzcan los mismos bytes. Se hashean la
+            # tabla de lados izquierdos, los arrays y el texto plano tal cual,
+            # sin decodificar cada producción.
+            h = hashlib.blake2b(digest_size=20)
+            h.update(f"{len(self.lhs_names)};".encode("utf-8"))
+            for name in self.lhs_names:
+                h.update(f"{len(name)}:{name}".encode("utf-8"))
+            for values in (self.prod_lhs, self.rhs_offsets):
+                h.update(f"{len(values)};".encode("utf-8"))
+                h.update(values.tobytes())
+            flat = self._flat_text().encode("utf-8")
+            h.update(f"{len(flat)};".encode("utf-8"))
+            h.update(flat)
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def to_productions(self):
+        """Devuelve el diccionario en el formato de parse_grammar."""
+        productions = {}
+        for lhs, rhs in self.iter_productions():
+            productions.setdefault(lhs, []).append(rhs)
+        return productions
@@ -1,4 +1,20 @@
+import io
 import re
+import time
+
+from grammar_ir import GrammarIR
+from profiler import timed
+
+# Advertencia compartida por validate_grammar e IncrementalParser
+INTERNAL_SPACE_WARNING = (
+    "La producción '{lhs} -> {rhs}' contiene espacios internos; "
+    "esto puede causar ambigüedad en la interpretación."
+)
+
+
+def has_internal_space(rhs):
+    return any(c.isspace() for c in rhs)
+
 
 class GrammarParser:
     """
@@ -22,6 +38,7 @@ class GrammarParser:
             r'^\s*([A-Za-z][A-Za-z0-9_]*)\s*(?:->|→)\s*(.+)\s*$'
         )
 
+    @timed("parse_grammar")
     def parse_grammar(self, grammar_text):
         """
         Parsea el texto de gramática y devuelve un diccionario:
@@ -30,71 +47,461 @@ class GrammarParser:
 
         Si no se reconoce ninguna producción válida, devuelve {} para que
         el resto del programa pueda interpretar la entrada como autómata.
+
+        También acepta un archivo abierto o cualquier iterable de líneas.
         """
+        return self._group(grammar_text)
+
+    def _group(self, source):
+        # Mismo recorrido que iter_productions, sin el generador de por medio:
+        # cada línea agrega sus alternativas a la lista de su lado izquierdo
+        if isinstance(source, str):
+            source = io.StringIO(source)
         productions = {}
-        lines = grammar_text.splitlines()
+        parse_line = self.parse_line
+        for line in source:
+            pairs = parse_line(line)
+            if pairs:
+                lhs = pairs[0][0]
+                rhs_list = productions.get(lhs)
+                if rhs_list is None:
+                    rhs_list = productions[lhs] = []
+                for _, rhs in pairs:
+                    rhs_list.append(rhs)
+        return productions
 
-        for line in lines:
-            stripped = line.strip()
-            # Ignorar comentarios o líneas vacías
-            if not stripped or stripped.startswith("#") or stripped.startswith("//"):
-                continue
+    def iter_productions(self, source):
+        """
+        Versión en streaming de parse_grammar: genera pares (lhs, rhs)
+        a medida que se leen las líneas, sin construir el diccionario.
 
-            m = self.production_pattern.match(stripped)
-            if not m:
-                continue
+        `source` puede ser un string, un archivo abierto o cualquier
+        iterable de líneas. Con un archivo nunca se carga el texto
+        completo en memoria.
+        """
+        if isinstance(source, str):
+            source = io.StringIO(source)
 
-            lhs = m.group(1)
-            rhs_part = m.group(2)
+        parse_line = self.parse_line
+        for line in source:
+            pairs = parse_line(line)
+            if pairs:
+                yield from pairs
 
-            alternatives = [alt.strip() for alt in rhs_part.split("|")]
+    def parse_line(self, line):
+        """
+        Parsea una sola línea. Devuelve la tupla de pares (lhs, rhs) de sus
+        alternativas, () si es vacía o comentario, o None si no tiene el
+        formato de una producción.
+        """
+        stripped = line.strip()
+        # Ignorar comentarios o líneas vacías
+        if not stripped or stripped.startswith(("#", "//")):
+            return ()
 
-            for alt in alternatives:
-                if alt in ("ε", "lambda", "λ"):
-                    rhs = ""  # representamos epsilon como cadena vacía
-                else:
-                    rhs = alt
+        m = self.production_pattern.match(stripped)
+        if m is None:
+            return None
 
-                productions.setdefault(lhs, []).append(rhs)
+        lhs, rhs_part = m.groups()
+        pairs = []
+        for alt in rhs_part.split("|"):
+            alt = alt.strip()
+            if alt in ("ε", "lambda", "λ"):
+                alt = ""  # representamos epsilon como cadena vacía
+            pairs.append((lhs, alt))
+        return tuple(pairs)
 
-        return productions
+    @timed("parse_grammar_ir")
+    def parse_grammar_ir(self, source):
+        """
+        Igual que parse_grammar, pero devuelve la representación compacta
+        GrammarIR (lados derechos en un texto plano, con las producciones en
+        el mismo orden que el diccionario).
+        """
+        return GrammarIR.from_productions(self._group(source))
+
+    def parse_file(self, path, encoding="utf-8"):
+        """Genera las producciones de un archivo línea por línea."""
+        with open(path, encoding=encoding) as f:
+            yield from self.iter_productions(f)
 
     def validate_grammar(self, productions):
         """
         Valida la estructura básica de una gramática.
         Devuelve (errores, advertencias).
+
+        `productions` puede ser el diccionario de parse_grammar o un
+        iterable de pares (lhs, rhs) como el que genera iter_productions.
         """
         errors = []
         warnings = []
 
-        if not productions:
-            errors.append("La gramática está vacía o no se reconoció ninguna producción.")
-            return errors, warnings
+        if isinstance(productions, dict):
+            # rhs None = variable sin producciones
+            pairs = (
+                (lhs, rhs)
+                for lhs, rhs_list in productions.items()
+                for rhs in (rhs_list or [None])
+            )
+        else:
+            pairs = productions
 
-        for lhs, rhs_list in productions.items():
-            if not lhs:
-                errors.append("Se encontró un lado izquierdo vacío.")
-                continue
+        seen_lhs = set()
+        for lhs, rhs in pairs:
+            if lhs not in seen_lhs:
+                seen_lhs.add(lhs)
+                if lhs and rhs is None:
+                    # Solo se advierte; el lado izquierdo no se valida
+                    warnings.append(f"La variable '{lhs}' no tiene producciones.")
+                    continue
+                self._validate_lhs(lhs, errors)
 
-            if not rhs_list:
-                warnings.append(f"La variable '{lhs}' no tiene producciones.")
+            if not lhs or rhs is None:
                 continue
 
-            # LHS debe ser un identificador alfanumérico
-            if not lhs[0].isalpha():
-                errors.append(f"El lado izquierdo '{lhs}' debe iniciar con una letra.")
-            if not all(c.isalnum() or c == "_" for c in lhs):
-                errors.append(f"El lado izquierdo '{lhs}' contiene caracteres inválidos.")
-
             # RHS puede ser cadena vacía (epsilon) o combinación de símbolos
-            for rhs in rhs_list:
-                if rhs == "":
-                    # epsilon: permitido
-                    continue
-                if any(c.isspace() for c in rhs):
-                    warnings.append(
-                        f"La producción '{lhs} -> {rhs}' contiene espacios internos; "
-                        "esto puede causar ambigüedad en la interpretación."
-                    )
+            if rhs == "":
+                # epsilon: permitido
+                continue
+            if has_internal_space(rhs):
+                warnings.append(INTERNAL_SPACE_WARNING.format(lhs=lhs, rhs=rhs))
+
+        if not seen_lhs:
+            errors.append("La gramática está vacía o no se reconoció ninguna producción.")
 
         return errors, warnings
+
+    def _validate_lhs(self, lhs, errors):
+        if not lhs:
+            errors.append("Se encontró un lado izquierdo vacío.")
+            return
+
+        # LHS debe ser un identificador alfanumérico
+        if not lhs[0].isalpha():
+            errors.append(f"El lado izquierdo '{lhs}' debe iniciar con una letra.")
+        if not all(c.isalnum() or c == "_" for c in lhs):
+            errors.append(f"El lado izquierdo '{lhs}' contiene caracteres inválidos.")
+
+
+class IncrementalParser:
+    """
+    Parser incremental para el editor (un text_buffer.GapBuffer).
+
+    Guarda lo parseado de cada línea en `lines` (por posición) y, en cada
+    sync(), vuelve a parsear solo las líneas que el buffer marcó como
+    cambiadas; además reutiliza el resultado de cualquier línea con el
+    mismo contenido. El costo después de una tecla es proporcional a la
+    edición, no al archivo.
+
+    Cada línea guarda (pares, diagnósticos), así que los avisos salen con
+    su número de línea (ver diagnostics()).
+
+    Con `budget_ms`, sync() se detiene al agotar ese tiempo y sigue en la
+    próxima llamada (un pegado de miles de líneas se reparte entre cuadros);
+    `ready` indica si ya no queda nada pendiente.
+
+    Si se indica `session` (p. ej. classifier.ClassificationSession), se le
+    pasan como deltas los pares de las líneas quitadas y de las parseadas,
+    con la posición de su línea como clave (ver _place): la sesión informa
+    así la misma violación que una clasificación del texto completo.
+    """
+
+    MAX_CACHED_LINES = 65536
+    # Posiciones de las líneas para la sesión: enteros crecientes que no
+    # cambian al insertar o borrar otras líneas. Las líneas nuevas se
+    # reparten en el hueco entre sus vecinas; si queda menos de MIN_GAP por
+    # línea, se reparte de nuevo una ventana alrededor, que se duplica
+    # hasta tener lugar.
+    LABEL_SPACING = 1 << 32
+    MIN_GAP = 1 << 16
+
+    def __init__(self, parser=None, session=None):
+        self.parser = parser or GrammarParser()
+        self.session = session
+        self.lines = []
+        self._labels = []        # posición de cada línea (solo con sesión)
+        self.reparsed = 0        # líneas parseadas en el último sync()
+        self._buffer = None
+        self._version = None
+        self._by_content = {}
+        self._pending = None     # (lo, hi): zona con líneas sin parsear
+        # Cambia con cada cambio del texto; los resultados armados a partir
+        # de las líneas (ir(), productions) se guardan como (generación, valor)
+        self._generation = 0
+        self._ir = None
+        self._productions = None
+        # Resumen de los avisos, al día con cada sync(): cantidad total y
+        # una cota L tal que ninguna línea parseada antes de L tiene avisos
+        # (_diagnostics_exact: la línea L tiene avisos)
+        self._diagnostic_count = 0
+        self._diagnostics_from = 0
+        self._diagnostics_exact = False
+
+    @property
+    def ready(self):
+        return self._pending is None and self._buffer is not None
+
+    def is_current(self, buffer):
+        return self.ready and buffer is self._buffer and buffer.version == self._version
+
+    @timed("parse_incremental")
+    def sync(self, buffer, budget_ms=None):
+        """
+        Pone `lines` al día con el contenido de `buffer`. Devuelve True si
+        terminó, o False si se agotó `budget_ms` (ver `ready`).
+        """
+        changes = None
+        if buffer is self._buffer:
+            changes = buffer.changes_since(self._version)
+        self._buffer = buffer
+        self._version = buffer.version
+        self.reparsed = 0
+        if changes != []:
+            self._generation += 1
+
+        if changes is None:
+            count = buffer.lines.line_count()
+            self.lines = [None] * count
+            if self.session is not None:
+                self.session.clear()
+                self._labels = list(range(0, count * self.LABEL_SPACING, self.LABEL_SPACING))
+            self._pending = (0, count)
+            self._diagnostic_count = 0
+            self._diagnostics_from = count
+            self._diagnostics_exact = False
+            changes = []
+
+        # 1) Aplicar los cambios con huecos (None) y acotar la zona tocada,
+        #    en las coordenadas de líneas finales
+        lines = self.lines
+        session = self.session
+        labels = self._labels
+        lo, hi = self._pending or (None, None)
+        for first, removed, added in changes:
+            for i in range(first, first + removed):
+                entry = lines[i]
+                if entry is not None:
+                    self._diagnostic_count -= len(entry[1])
+                    if session is not None:
+                        session.apply(removed=entry[0], key=labels[i])
+            lines[first : first + removed] = [None] * added
+            if session is not None:
+                self._place(first, removed, added)
+            delta = added - removed
+            # Las líneas antes de `first` no cambian; las de después se corren
+            if self._diagnostics_from >= first + removed:
+                self._diagnostics_from += delta
+            elif self._diagnostics_from >= first:
+                self._diagnostics_from = first
+                self._diagnostics_exact = False
+            if lo is None:
+                lo, hi = first, first + added
+            elif hi <= first:
+                lo, hi = min(lo, first), first + added
+            elif lo >= first + removed:
+                lo, hi = first, hi + delta
+            else:
+                lo, hi = min(lo, first), max(hi + delta, first + added)
+
+        if lo is None:
+            return True
+
+        # 2) Parsear solo los huecos: el resto de las líneas no cambió
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        for i in range(lo, hi):
+            if lines[i] is None:
+                lines[i] = entry = self._parse(buffer.line_text(i))
+                if entry[1]:
+                    self._diagnostic_count += len(entry[1])
+                    if i <= self._diagnostics_from:
+                        self._diagnostics_from = i
+                        self._diagnostics_exact = True
+                if session is not None:
+                    session.apply(added=entry[0], key=labels[i])
+                if deadline is not None and not i % 64 and time.perf_counter() > deadline:
+                    self._pending = (i + 1, hi)
+                    return False
+        self._pending = None
+        return True
+
+    def _place(self, first, removed, added):
+        """
+        Da posición a las `added` líneas nuevas que reemplazaron a `removed`
+        desde `first` (ya aplicado en `lines`), y cambia la clave en la
+        sesión de las líneas ya parseadas que se reparten de nuevo.
+        """
+        labels = self._labels
+        lines = self.lines
+        labels[first : first + removed] = [None] * added
+        a, b = first, first + added
+        width = 1
+        while True:
+            lo = labels[a - 1] if a else None
+            hi = labels[b] if b < len(labels) else None
+            if lo is None or hi is None or (hi - lo) // (b - a + 1) >= self.MIN_GAP:
+                break
+            a, b = max(0, a - width), min(len(labels), b + width)
+            width *= 2
+
+        n = b - a
+        if lo is None and hi is None:
+            new = range(0, n * self.LABEL_SPACING, self.LABEL_SPACING)
+        elif hi is None:
+            new = range(lo + self.LABEL_SPACING, lo + (n + 1) * self.LABEL_SPACING, self.LABEL_SPACING)
+        elif lo is None:
+            new = range(hi - n * self.LABEL_SPACING, hi, self.LABEL_SPACING)
+        else:
+            step = (hi - lo) // (n + 1)
+            new = range(lo + step, lo + (n + 1) * step, step)
+
+        # Primero se quitan todas las claves viejas de la ventana, para que
+        # una nueva no coincida con una vieja todavía en la sesión
+        moved = [i for i in range(a, b) if lines[i] is not None and lines[i][0]]
+        for i in moved:
+            self.session.apply(removed=lines[i][0], key=labels[i])
+        labels[a:b] = new
+        for i in moved:
+            self.session.apply(added=lines[i][0], key=labels[i])
+
+    def _parse(self, line):
+        entry = self._by_content.get(line)
+        if entry is None:
+            self.reparsed += 1
+            pairs = self.parser.parse_line(line)
+            entry = (pairs or (), self._diagnose(line, pairs))
+            if len(self._by_content) >= self.MAX_CACHED_LINES:
+                self._by_content.clear()
+            self._by_content[line] = entry
+        return entry
+
+    def _diagnose(self, line, pairs):
+        if pairs is None:
+            return (
+                ("advertencia", "La línea no tiene el formato 'Variable -> símbolos'; se ignora."),
+            )
+        return tuple(
+            ("advertencia", INTERNAL_SPACE_WARNING.format(lhs=lhs, rhs=rhs))
+            for lhs, rhs in pairs
+            if has_internal_space(rhs)
+        )
+
+    # ------------------------------------------------------------------
+    # Resultados
+    # ------------------------------------------------------------------
+    def pairs(self):
+        """Pares (lhs, rhs) en el orden del texto, como iter_productions."""
+        return [pair for pairs, _ in self.lines for pair in pairs]
+
+    @property
+    def productions(self):
+        """
+        Diccionario {lhs: [rhs, ...]} igual al de parse_grammar; se arma
+        una vez por versión del texto, como ir().
+        """
+        cached = self._productions
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+        productions = {}
+        for pairs, _ in self.lines:
+            for lhs, rhs in pairs:
+                productions.setdefault(lhs, []).append(rhs)
+        if self.ready:
+            self._productions = (self._generation, productions)
+        return productions
+
+    def ir(self):
+        """GrammarIR de las producciones; se arma una vez por versión del texto."""
+        cached = self._ir
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+        ir = GrammarIR.from_pairs(self.pairs())
+        if self.ready:
+            self._ir = (self._generation, ir)
+        return ir
+
+    def snapshot(self, buffer, with_text=False):
+        """
+        Copia de `buffer` para armar sus producciones en un trabajo en
+        segundo plano (ver GrammarSnapshot), sin parsear nada en el hilo de
+        la interfaz: las líneas ya parseadas si están al día, o si no (p.
+        ej. justo después de pegar miles de líneas) el texto completo.
+        Con with_text la copia trae siempre el texto.
+        """
+        if self.is_current(buffer):
+            lines = list(self.lines)
+            # Sin with_text, el texto solo hace falta si no hay producciones
+            # (para probarlo como autómata); any() se detiene en la primera
+            text = None
+            if with_text or not any(pairs for pairs, _ in lines):
+                text = buffer.text()
+            return GrammarSnapshot(self, self._generation, lines, text)
+        if buffer is self._buffer and buffer.version == self._version:
+            generation = self._generation
+        else:
+            generation = None   # el texto es más nuevo que lo sincronizado
+        return GrammarSnapshot(self, generation, text=buffer.text())
+
+    def _store_ir(self, generation, ir):
+        # Lo llama GrammarSnapshot desde el trabajo; una copia vieja no pisa
+        # el IR de la versión actual
+        if generation is not None and generation == self._generation:
+            self._ir = (generation, ir)
+
+    def diagnostics(self):
+        """Genera (número de línea desde 1, severidad, mensaje)."""
+        for number, (_, messages) in enumerate(self.lines, 1):
+            for severity, message in messages:
+                yield number, severity, message
+
+    def diagnostics_summary(self):
+        """
+        (cantidad, primero) de los avisos de diagnostics(), sin recorrer
+        todas las líneas: sync() los lleva al día con cada cambio. Solo se
+        busca el primero de nuevo cuando se editó su línea, y desde ahí.
+        """
+        if not self._diagnostic_count:
+            return 0, None
+        lines = self.lines
+        i = self._diagnostics_from
+        if not self._diagnostics_exact:
+            while i < len(lines) and not (lines[i] is not None and lines[i][1]):
+                i += 1
+            if i == len(lines):
+                return self._diagnostic_count, None   # aún sin parsear
+            self._diagnostics_from = i
+            self._diagnostics_exact = True
+        severity, message = lines[i][1][0]
+        return self._diagnostic_count, (i + 1, severity, message)
+
+
+class GrammarSnapshot:
+    """
+    Producciones del editor tomadas en un momento (ver
+    IncrementalParser.snapshot), para usar en un trabajo en segundo plano.
+
+    Guarda las entradas de las líneas ya parseadas (tuplas que no cambian)
+    o el texto, que recién se parsea al pedir ir(). Así el hilo de la
+    interfaz no arma pares ni GrammarIR al pulsar F1, visualizar o exportar.
+    `text` es el texto del editor cuando no hay producciones (o no se
+    había parseado), y None si no hace falta.
+    """
+
+    def __init__(self, owner, generation, lines=None, text=None):
+        self.owner = owner
+        self.generation = generation
+        self.lines = lines
+        self.text = text
+        self._ir = None
+
+    def ir(self):
+        """GrammarIR de la copia; el IncrementalParser lo reutiliza si sigue al día."""
+        if self._ir is None:
+            if self.lines is not None:
+                self._ir = GrammarIR.from_pairs(
+                    [pair for pairs, _ in self.lines for pair in pairs]
+                )
+            else:
+                self._ir = self.owner.parser.parse_grammar_ir(self.text)
+            self.owner._store_ir(self.generation, self._ir)
+        return self._ir
@@ -0,0 +1,129 @@
+"""
+Eliminación de símbolos inútiles (reducción de una gramática).
+
+    from grammar_reduction import reduce_grammar
+
+    reduction = reduce_grammar(productions)
+    classifier.classify(reduction["grammar"])
+
+Un no terminal es inútil si no genera ninguna cadena de terminales (no
+productivo) o si no se llega a él desde S (inalcanzable). Las dos pasadas
+usan colas de trabajo y tocan cada aparición de un símbolo una sola vez,
+así que el costo es O(|G|), lineal en el tamaño de la gramática.
+"""
+from collections import deque
+
+from classifier import START_SYMBOL
+from grammar_ir import GrammarIR, is_nonterminal
+
+
+def reduce_grammar(productions, start=START_SYMBOL):
+    """
+    Quita las producciones con no terminales no productivos o inalcanzables.
+
+    `productions` puede ser un GrammarIR, el diccionario de parse_grammar o
+    un iterable de pares (lhs, rhs). Devuelve un diccionario con:
+        - grammar: GrammarIR con las producciones que quedan (en el orden
+          original), listo para el clasificador o el visualizador
+        - non_productive: no terminales que no generan cadenas de terminales
+        - unreachable: no terminales productivos a los que no se llega desde
+          `start`
+        - removed: producciones (lhs, rhs) eliminadas, en el orden original
+        - empty: el lenguaje es vacío (`start` no es productivo)
+        - reduced: False si no se aplicó (la gramática no es de Tipo 2 / 3)
+
+    La reducción solo está definida para gramáticas libres de contexto: si
+    algún lado izquierdo no es un solo no terminal, la gramática se devuelve
+    sin cambios.
+    """
+    ir = GrammarIR.coerce(productions)
+    n = len(ir)
+    if not all(ir.lhs_is_variable):
+        return _result(ir, [], [], [], empty=False, reduced=False)
+
+    prod_lhs = ir.prod_lhs
+    lhs_names = ir.lhs_names
+    lhs_ids = ir.lhs_ids
+    productions = list(ir.iter_productions())
+
+    # 1) Productivos: una producción lo es cuando ya no le quedan no
+    #    terminales pendientes; entonces su lado izquierdo es productivo
+    nt_count = ir.shape_nt_count
+    pending = [nt_count[shape] for shape in ir.prod_shape]
+    occurrences = {}
+    for i, (_, rhs) in enumerate(productions):
+        if pending[i]:
+            for ch in rhs:
+                if is_nonterminal(ch):
+                    occurrences.setdefault(ch, []).append(i)
+
+    productive = bytearray(len(lhs_names))
+    queue = deque(i for i in range(n) if not pending[i])
+    while queue:
+        lid = prod_lhs[queue.popleft()]
+        if productive[lid]:
+            continue
+        productive[lid] = 1
+        for i in occurrences.get(lhs_names[lid], ()):
+            pending[i] -= 1
+            if not pending[i]:
+                queue.append(i)
+
+    useful = bytearray(n)
+    for i in range(n):
+        useful[i] = not pending[i] and productive[prod_lhs[i]]
+
+    # 2) Alcanzables desde `start`, usando solo producciones productivas.
+    #    Todos los lados izquierdos son un solo no terminal, así que un
+    #    carácter del lado derecho está en lhs_ids solo si es uno de ellos
+    by_lhs = [[] for _ in lhs_names]
+    for i in range(n):
+        if useful[i]:
+            by_lhs[prod_lhs[i]].append(i)
+
+    reachable = bytearray(len(lhs_names))
+    start_id = lhs_ids.get(start)
+    empty = start_id is None or not productive[start_id]
+    if not empty:
+        reachable[start_id] = 1
+        queue = deque([start_id])
+        while queue:
+            for i in by_lhs[queue.popleft()]:
+                for ch in productions[i][1]:
+                    lid = lhs_ids.get(ch)
+                    if lid is not None and not reachable[lid]:
+                        reachable[lid] = 1
+                        queue.append(lid)
+
+    # 3) Armar la gramática reducida en el orden original
+    grammar = GrammarIR()
+    kept = []
+    removed = []
+    for i, pair in enumerate(productions):
+        if useful[i] and reachable[prod_lhs[i]]:
+            kept.append(pair)
+        else:
+            removed.append(pair)
+    grammar.add_productions(kept)
+
+    # Los no terminales usados en algún lado derecho pero sin producciones
+    # tampoco son productivos
+    undefined = {ch for ch in ir.rhs_symbols if is_nonterminal(ch) and ch not in lhs_ids}
+    non_productive = sorted(
+        {name for lid, name in enumerate(lhs_names) if not productive[lid]} | undefined
+    )
+    unreachable = sorted(
+        name for lid, name in enumerate(lhs_names) if productive[lid] and not reachable[lid]
+    )
+    return _result(grammar, non_productive, unreachable, removed, empty, reduced=True)
+
+
+def _result(grammar, non_productive, unreachable, removed, empty, reduced):
+    return {
+        "grammar": grammar,
+        "non_productive": non_productive,
+        "unreachable": unreachable,
+        "removed": removed,
+        "empty": empty,
+        "reduced": reduced,
+    }
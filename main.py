@@ -1,10 +1,32 @@
+import time
+
+_START_TIME = time.perf_counter()
+
 import pygame
 import sys
 from menu_principal import MainMenu
+from scene_manager import SceneManager
+
+_IMPORTS_DONE_TIME = time.perf_counter()
+
+# Módulos pesados que no deberían cargarse antes del primer cuadro
+DEFERRED_MODULES = (
+    "classifier_ui",
+    "visualizer",
+    "report_generator",
+    "graphviz",
+    "fpdf",
+    "games.flashcards",
+    "games.memory_game",
+    "games.quiz_race",
+)
 
 
 class ChomskyClassifierApp:
-    def __init__(self):
+    def __init__(self, measure_startup=False):
+        # Con measure_startup se dibuja un cuadro, se reportan los tiempos
+        # de arranque y la aplicación termina
+        self.measure_startup = measure_startup
         pygame.init()
 
         # Configuración de la pantalla
@@ -25,8 +47,9 @@ class ChomskyClassifierApp:
             },
         }
 
-        # Menú principal
+        # Menú principal (base de la pila de escenas)
         self.main_menu = MainMenu(self.screen, self.assets)
+        self.scenes = SceneManager(self.screen, self.assets, self.main_menu)
 
     def create_background(self):
         bg = pygame.Surface((self.screen_width, self.screen_height))
@@ -55,30 +78,31 @@ class ChomskyClassifierApp:
         return bg
 
     def run(self):
-        """Bucle principal."""
-        clock = pygame.time.Clock()
-        running = True
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                else:
-                    self.main_menu.handle_event(event)
-
-            self.main_menu.update()
-
-            # Dibujar
-            self.screen.blit(self.assets["background"], (0, 0))
-            self.main_menu.draw()
-
-            pygame.display.flip()
-            clock.tick(60)
-
+        """Bucle principal (uno solo para todas las escenas)."""
+        self.scenes.run(self.report_startup if self.measure_startup else None)
         pygame.quit()
         sys.exit()
 
+    def report_startup(self):
+        """
+        Imprime los tiempos de importación, inicialización y primer cuadro.
+        Devuelve True para que el bucle termine.
+        """
+        first_frame = time.perf_counter()
+        imports_ms = (_IMPORTS_DONE_TIME - _START_TIME) * 1000
+        total_ms = (first_frame - _START_TIME) * 1000
+        loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+
+        print("Tiempos de arranque (desde el inicio de main.py):")
+        print(f"  Importaciones:  {imports_ms:8.1f} ms")
+        print(f"  Primer cuadro:  {total_ms:8.1f} ms")
+        print(
+            "  Módulos diferidos cargados antes del primer cuadro: "
+            + (", ".join(loaded) if loaded else "ninguno")
+        )
+        return True
+
 
 if __name__ == "__main__":
-    app = ChomskyClassifierApp()
+    app = ChomskyClassifierApp(measure_startup="--startup-time" in sys.argv[1:])
     app.run()
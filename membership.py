@@ -0,0 +1,237 @@
+"""
+Pertenencia de cadenas a gramáticas libres de contexto (Tipo 2 / 3).
+
+    from membership import MembershipEngine
+
+    engine = MembershipEngine(parser.parse_grammar("S -> aSb | ab"))
+    engine.accepts("aabb")                  # True
+    engine.accepts_many(["ab", "aab", ""])  # [True, False, False]
+
+La gramática se reduce (grammar_reduction), se pasa a forma normal de
+Chomsky (to_cnf) y cada cadena se reconoce con CYK. Como en el resto del
+programa, cada carácter es un símbolo: las mayúsculas son no terminales y
+el resto terminales.
+"""
+from collections import deque
+
+from classifier import START_SYMBOL
+from grammar_ir import GrammarIR
+from grammar_reduction import reduce_grammar
+
+
+def to_cnf(productions, start=START_SYMBOL):
+    """
+    Convierte una gramática libre de contexto a forma normal de Chomsky.
+
+    Devuelve (reglas, acepta_vacía): reglas es una lista de (A, (a,)) o
+    (A, (B, C)) sin repetir, y acepta_vacía indica si ε está en el lenguaje
+    (la FNC no la representa). Los no terminales nuevos tienen nombres de
+    varios caracteres ("<a>", "<S1>"...), así que no chocan con los
+    símbolos de la gramática.
+
+    Lanza ValueError si algún lado izquierdo no es un solo no terminal.
+    """
+    ir = GrammarIR.coerce(productions)
+    reduction = reduce_grammar(ir, start)
+    if not reduction["reduced"]:
+        raise ValueError(
+            "La forma normal de Chomsky solo se define para gramáticas libres de "
+            "contexto: cada lado izquierdo debe ser un solo no terminal."
+        )
+    if reduction["empty"]:
+        return [], False
+
+    # Tras la reducción, toda mayúscula de un lado derecho tiene producciones
+    variables = set(reduction["grammar"].lhs_names)
+    rules = []
+    terminal_vars = {}
+    chains = 0
+
+    for lhs, rhs in reduction["grammar"].iter_productions():
+        symbols = list(rhs)
+        # 1) TERM: en lados derechos largos, cada terminal pasa a "<a>"
+        if len(symbols) > 1:
+            for i, symbol in enumerate(symbols):
+                if symbol not in variables:
+                    name = terminal_vars.get(symbol)
+                    if name is None:
+                        name = terminal_vars[symbol] = f"<{symbol}>"
+                        rules.append((name, (symbol,)))
+                    symbols[i] = name
+        # 2) BIN: A -> X1 X2 X3 ... queda como A -> X1 <A1>, <A1> -> X2 ...
+        head = lhs
+        while len(symbols) > 2:
+            chains += 1
+            name = f"<{lhs}{chains}>"
+            rules.append((head, (symbols[0], name)))
+            head = name
+            symbols = symbols[1:]
+        rules.append((head, tuple(symbols)))
+
+    variables.update(lhs for lhs, _ in rules)
+
+    # 3) DEL: quitar las reglas ε, agregando las variantes sin los anulables
+    nullable = _nullable(rules, variables)
+    expanded = set()
+    for lhs, symbols in rules:
+        if len(symbols) == 2:
+            first, second = symbols
+            expanded.add((lhs, symbols))
+            if first in nullable:
+                expanded.add((lhs, (second,)))
+            if second in nullable:
+                expanded.add((lhs, (first,)))
+        elif symbols:
+            expanded.add((lhs, symbols))
+
+    # 4) UNIT: A -> B se reemplaza por las reglas no unitarias de todo lo
+    #    alcanzable desde A con reglas unitarias
+    units = {}
+    proper = {}
+    for lhs, symbols in expanded:
+        if len(symbols) == 1 and symbols[0] in variables:
+            units.setdefault(lhs, []).append(symbols[0])
+        else:
+            proper.setdefault(lhs, []).append(symbols)
+
+    result = set()
+    for lhs in variables:
+        seen = {lhs}
+        queue = deque([lhs])
+        while queue:
+            current = queue.popleft()
+            for symbols in proper.get(current, ()):
+                result.add((lhs, symbols))
+            for target in units.get(current, ()):
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+
+    return sorted(result), start in nullable
+
+
+def _nullable(rules, variables):
+    """No terminales que derivan ε (cola de trabajo, lineal en las reglas)."""
+    pending = []
+    occurrences = {}
+    queue = deque()
+    for index, (lhs, symbols) in enumerate(rules):
+        count = 0
+        for symbol in symbols:
+            if symbol in variables:
+                occurrences.setdefault(symbol, []).append(index)
+                count += 1
+            else:
+                count = -1  # un terminal: la regla nunca es anulable
+                break
+        pending.append(count)
+        if count == 0:
+            queue.append(lhs)
+
+    nullable = set()
+    while queue:
+        lhs = queue.popleft()
+        if lhs in nullable:
+            continue
+        nullable.add(lhs)
+        for index in occurrences.get(lhs, ()):
+            if pending[index] > 0:
+                pending[index] -= 1
+                if pending[index] == 0:
+                    queue.append(rules[index][0])
+    return nullable
+
+
+class MembershipEngine:
+    """
+    Reconocedor CYK para una gramática libre de contexto.
+
+    La tabla se guarda con bits: para cada posición inicial i y cada no
+    terminal A hay un entero de Python cuyo bit j está encendido si A
+    deriva w[i:j]. Las filas se llenan de derecha a izquierda; al
+    descubrir que B deriva w[i:k], cada regla A -> B C se aplica con un
+    solo OR (fila[A] |= fin[k][C]), que cubre todos los puntos de corte a
+    la vez en lugar de recorrer pares de conjuntos celda por celda.
+    """
+
+    def __init__(self, productions, start=START_SYMBOL):
+        self.start = start
+        self.rules, self.accepts_empty = to_cnf(productions, start)
+
+        # Un no terminal que solo derivaba ε puede quedar en un lado derecho
+        # sin reglas propias: nunca deriva nada, pero necesita su índice
+        names = {start}
+        for lhs, symbols in self.rules:
+            names.add(lhs)
+            if len(symbols) == 2:
+                names.update(symbols)
+        names = sorted(names)
+        ids = {name: index for index, name in enumerate(names)}
+        self.variables = names
+        self._start_id = ids[start]
+
+        # terminal -> no terminales que lo generan; B -> [(A, C)] por A -> B C
+        self._terminal_heads = {}
+        by_left = [[] for _ in names]
+        for lhs, symbols in self.rules:
+            if len(symbols) == 1:
+                self._terminal_heads.setdefault(symbols[0], []).append(ids[lhs])
+            else:
+                by_left[ids[symbols[0]]].append((ids[lhs], ids[symbols[1]]))
+        self._by_left = by_left
+        self._lefts = [b for b, pairs in enumerate(by_left) if pairs]
+
+    def accepts(self, string):
+        """Indica si `string` (texto o secuencia de símbolos) está en el lenguaje."""
+        n = len(string)
+        if n == 0:
+            return self.accepts_empty
+
+        terminal_heads = self._terminal_heads
+        if any(symbol not in terminal_heads for symbol in string):
+            return False
+
+        by_left = self._by_left
+        lefts = self._lefts
+        count = len(self.variables)
+        # rows[i][A]: bits j tales que A deriva string[i:j]
+        rows = [None] * (n + 1)
+        rows[n] = [0] * count
+
+        for i in range(n - 1, -1, -1):
+            row = [0] * count
+            bit = 1 << (i + 1)
+            for a in terminal_heads[string[i]]:
+                row[a] |= bit
+
+            # Recorrer en orden los k en los que termina algún B de la fila;
+            # los bits nuevos siempre quedan a la derecha de k
+            k = i
+            while True:
+                ends = 0
+                for b in lefts:
+                    ends |= row[b]
+                rest = ends >> (k + 1)
+                if not rest:
+                    break
+                k += (rest & -rest).bit_length()
+                suffix = rows[k]
+                for b in lefts:
+                    if row[b] >> k & 1:
+                        for a, c in by_left[b]:
+                            row[a] |= suffix[c]
+            rows[i] = row
+
+        return bool(rows[0][self._start_id] >> n & 1)
+
+    def accepts_many(self, strings):
+        """accepts() para cada cadena (las repetidas se reconocen una vez)."""
+        seen = {}
+        results = []
+        for string in strings:
+            key = string if isinstance(string, str) else tuple(string)
+            result = seen.get(key)
+            if result is None:
+                result = seen[key] = self.accepts(string)
+            results.append(result)
+        return results
@@ -1,10 +1,8 @@
 import pygame
-import sys
 import math
-from classifier_ui import ClassifierUI
-from games.flashcards import FlashcardGame
-from games.memory_game import MemoryGame
-from games.quiz_race import QuizRaceGame
+
+from frame_scheduler import DirtyRegions
+from render_cache import get_font, render_text
 
 
 class MainMenu:
@@ -14,6 +12,7 @@ class MainMenu:
         self.buttons = []
         self.current_selection = 0
         self.camera_angle = 0
+        self.dirty = DirtyRegions(screen.get_rect())
         self.setup_menu()
 
     def setup_menu(self):
@@ -51,6 +50,11 @@ class MainMenu:
             )
 
     def handle_event(self, event):
+        """
+        Devuelve la acción elegida (ver scene_manager.SCENES), "quit" o None.
+        """
+        previous_selection = self.current_selection
+        result = None
         if event.type == pygame.MOUSEMOTION:
             for i, button in enumerate(self.buttons):
                 if button["rect"].collidepoint(event.pos):
@@ -61,7 +65,7 @@ class MainMenu:
                 for i, button in enumerate(self.buttons):
                     if button["rect"].collidepoint(event.pos):
                         self.current_selection = i
-                        self.execute_action(button["action"])
+                        result = self.execute_action(button["action"])
                         break
 
         elif event.type == pygame.KEYDOWN:
@@ -75,43 +79,20 @@ class MainMenu:
                 )
             elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
                 action = self.buttons[self.current_selection]["action"]
-                self.execute_action(action)
+                result = self.execute_action(action)
             elif event.key == pygame.K_ESCAPE:
-                pygame.quit()
-                sys.exit()
+                result = "quit"
+
+        # Solo se redibujan los botones que cambiaron de resaltado
+        if self.current_selection != previous_selection:
+            self.dirty.add(self.buttons[previous_selection]["rect"])
+            self.dirty.add(self.buttons[self.current_selection]["rect"])
+
+        return result
 
     def execute_action(self, action):
-        if action == "classifier":
-            ui = ClassifierUI(self.screen, self.assets)
-            result = ui.run()
-            if result == "quit":
-                pygame.quit()
-                sys.exit()
-
-        elif action == "flashcards":
-            game = FlashcardGame(self.screen, self.assets)
-            result = game.run()
-            if result == "quit":
-                pygame.quit()
-                sys.exit() 
-
-        elif action == "memory":
-            game = MemoryGame(self.screen, self.assets)
-            result = game.run()
-            if result == "quit":
-                pygame.quit()
-                sys.exit()
-
-        elif action == "quiz_race":
-            game = QuizRaceGame(self.screen, self.assets)
-            result = game.run()
-            if result == "quit":
-                pygame.quit()
-                sys.exit()
-
-        elif action == "exit":
-            pygame.quit()
-            sys.exit()
+        # El cambio de escena (o la salida) lo hace el SceneManager
+        return action
 
     def update(self):
         self.camera_angle = (self.camera_angle + 0.01) % 360
@@ -120,13 +101,15 @@ class MainMenu:
         width = self.screen.get_width()
         height = self.screen.get_height()
 
+        self.screen.blit(self.assets["background"], (0, 0))
+
         # Título
-        title_font = pygame.font.Font(None, 64)
-        subtitle_font = pygame.font.Font(None, 32)
+        title_font = get_font(None, 64)
+        subtitle_font = get_font(None, 32)
 
-        title = title_font.render("Chomsky Classifier AI", True, (255, 255, 255))
-        subtitle = subtitle_font.render(
-            "Aventura de clasificación de gramáticas", True, (255, 255, 0)
+        title = render_text(title_font, "Chomsky Classifier AI", True, (255, 255, 255))
+        subtitle = render_text(
+            subtitle_font, "Aventura de clasificación de gramáticas", True, (255, 255, 0)
         )
 
         self.screen.blit(
@@ -148,8 +131,8 @@ class MainMenu:
             pygame.draw.rect(self.screen, color, rect, border_radius=10)
             pygame.draw.rect(self.screen, (255, 255, 255), rect, 2, border_radius=10)
 
-            font = pygame.font.Font(None, 30)
-            text = font.render(button["text"], True, (255, 255, 255))
+            font = get_font(None, 30)
+            text = render_text(font, button["text"], True, (255, 255, 255))
             self.screen.blit(
                 text,
                 (
@@ -172,7 +155,7 @@ class MainMenu:
         pygame.draw.polygon(self.screen, (255, 255, 0), points)
 
         # Instrucciones
-        instruction_font = pygame.font.Font(None, 22)
+        instruction_font = get_font(None, 22)
         instructions = [
             "Usa el mouse o las flechas para navegar",
             "Pulsa ENTER o haz clic para seleccionar",
@@ -180,7 +163,7 @@ class MainMenu:
         ]
 
         for i, text_line in enumerate(instructions):
-            text = instruction_font.render(text_line, True, (230, 230, 230))
+            text = render_text(instruction_font, text_line, True, (230, 230, 230))
             self.screen.blit(
                 text,
                 (
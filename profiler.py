@@ -0,0 +1,127 @@
+"""
+Temporizadores livianos para saber en qué se va el tiempo.
+
+    from profiler import profiler, timed
+
+    with profiler.timer("classify"):
+        ...
+
+    @timed("generate_pdf")
+    def generate_pdf(...):
+        ...
+
+Cada medición se guarda en un buffer circular en memoria (las últimas
+`max_samples`), se resume con stats() y se puede volcar a CSV con
+dump_csv(). Solo usa la biblioteca estándar, así que también se puede
+importar desde la CLI o los procesos del lote.
+"""
+import csv
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Profiler:
+    def __init__(self, max_samples=20000):
+        # (instante de fin, nombre, duración en ms)
+        self.samples = deque(maxlen=max_samples)
+        self.enabled = True
+        self._lock = threading.Lock()
+
+    def record(self, name, ms):
+        if self.enabled:
+            with self._lock:
+                self.samples.append((time.time(), name, ms))
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name=None):
+        """Decorador: mide cada llamada con `name` (por defecto, el nombre de la función)."""
+
+        def decorator(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(label, (time.perf_counter() - start) * 1000)
+
+            return wrapper
+
+        return decorator
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def snapshot(self):
+        with self._lock:
+            return list(self.samples)
+
+    def durations(self, name, since=None):
+        """Duraciones (ms) registradas para `name`, opcionalmente desde el instante `since`."""
+        return [
+            ms
+            for t, sample_name, ms in self.snapshot()
+            if sample_name == name and (since is None or t >= since)
+        ]
+
+    def stats(self, name=None, since=None):
+        """
+        Resumen {nombre: {"count", "mean", "p50", "p95", "p99", "max", "last"}}
+        de todos los nombres (o solo de `name`).
+        """
+        by_name = {}
+        for t, sample_name, ms in self.snapshot():
+            if (name is None or sample_name == name) and (since is None or t >= since):
+                by_name.setdefault(sample_name, []).append(ms)
+        return {key: summarize(values) for key, values in by_name.items()}
+
+    def dump_csv(self, path):
+        """Escribe las muestras del buffer en `path` (timestamp, name, ms)."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "name", "ms"])
+            for t, name, ms in self.snapshot():
+                writer.writerow([f"{t:.6f}", name, f"{ms:.4f}"])
+        return path
+
+    def clear(self):
+        with self._lock:
+            self.samples.clear()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1] if ordered else 0.0,
+        "last": values[-1] if values else 0.0,
+    }
+
+
+# Instancia compartida por toda la aplicación
+profiler = Profiler()
+timer = profiler.timer
+timed = profiler.timed
@@ -0,0 +1,117 @@
+import os
+import time
+from datetime import datetime
+
+import pygame
+
+from profiler import profiler
+from render_cache import get_font
+
+# Fases de cada cuadro (las mide SceneManager / frame_scheduler.present)
+FRAME_PHASES = ("events", "update", "draw", "flip")
+
+# Llamadas costosas instrumentadas con @timed
+EXPENSIVE_CALLS = (
+    "parse_grammar",
+    "parse_grammar_ir",
+    "parse_incremental",
+    "classify",
+    "generate_diagram",
+    "generate_pdf",
+)
+
+
+class ProfilerOverlay:
+    """
+    Panel de rendimiento que se muestra encima de cualquier escena (F12).
+
+    Muestra FPS y percentiles del tiempo de cuadro de los últimos
+    `window` segundos, el tiempo de cada fase del cuadro y el de las
+    llamadas costosas. Con el panel abierto, F11 vuelca las mediciones a
+    un CSV en output/.
+    """
+
+    REFRESH_MS = 250
+
+    def __init__(self, screen, window=5.0):
+        self.screen = screen
+        self.window = window
+        self.visible = False
+        self.font = get_font(None, 20)
+        self.rect = pygame.Rect(screen.get_width() - 450, 10, 440, 10)
+        self.lines = []
+        self.message = None
+        self._next_refresh = 0
+
+    def toggle(self, dirty):
+        self.visible = not self.visible
+        self._next_refresh = 0
+        # Al ocultarlo hay que repintar la escena debajo
+        dirty.add(self.rect)
+
+    def dump_csv(self):
+        if not os.path.exists("output"):
+            os.makedirs("output")
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = profiler.dump_csv(os.path.join("output", f"profile_{stamp}.csv"))
+        self.message = f"CSV: {path}"
+        self._next_refresh = 0
+
+    def update(self, dirty):
+        if not self.visible:
+            return
+        now = pygame.time.get_ticks()
+        if now < self._next_refresh:
+            return
+        self._next_refresh = now + self.REFRESH_MS
+
+        dirty.add(self.rect)
+        self.lines = self.build_lines()
+        line_height = self.font.get_linesize()
+        self.rect.height = 16 + line_height * len(self.lines)
+        dirty.add(self.rect)
+
+    def build_lines(self):
+        stats = profiler.stats(since=time.time() - self.window)
+        frame = stats.get("frame")
+        fps = profiler.durations("frame", since=time.time() - 1.0)
+
+        lines = [f"Rendimiento (F12 ocultar, F11 CSV)    FPS: {len(fps)}"]
+        if frame:
+            lines.append(
+                "cuadro ms  p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {max:.1f}".format(**frame)
+            )
+        else:
+            lines.append("cuadro ms  (sin cuadros recientes)")
+
+        for phase in FRAME_PHASES:
+            s = stats.get(phase)
+            if s:
+                lines.append(f"  {phase:<8} media {s['mean']:6.2f}  p95 {s['p95']:6.2f}")
+
+        # Las llamadas costosas son esporádicas: se resume todo el buffer
+        all_stats = profiler.stats()
+        calls = [name for name in EXPENSIVE_CALLS if name in all_stats]
+        if calls:
+            lines.append("llamadas ms (última / p50 / n)")
+            for name in calls:
+                s = all_stats[name]
+                lines.append(f"  {name:<17} {s['last']:8.1f} {s['p50']:8.1f} {s['count']:5d}")
+
+        if self.message:
+            lines.append(self.message)
+        return lines
+
+    def draw(self):
+        if not self.visible:
+            return
+        panel = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+        self.screen.blit(panel, self.rect)
+
+        y = self.rect.y + 8
+        for line in self.lines:
+            # Los valores cambian en cada refresco: no vale la pena cachearlos
+            surf = self.font.render(line, True, (120, 255, 120))
+            self.screen.blit(surf, (self.rect.x + 8, y))
+            y += self.font.get_linesize()
@@ -0,0 +1,154 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class LineSurfaceCache:
+    """
+    Caché LRU de líneas de texto ya renderizadas, por (fuente, contenido).
+
+    Como la clave es el contenido de la línea, una edición solo invalida
+    las líneas que realmente cambiaron: las demás (aunque se hayan movido
+    de posición) se siguen reutilizando. También guarda el desplazamiento
+    x del cursor para cada columna ya consultada de la línea.
+    """
+
+    def __init__(self, color, antialias=True, max_entries=1024):
+        self.color = color
+        self.antialias = antialias
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def _entry(self, font, line):
+        key = (font, line)
+        entry = self._entries.get(key)
+        if entry is None:
+            # [superficie, {columna: x del cursor}]
+            entry = [font.render(line, self.antialias, self.color), {0: 0}]
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def surface(self, font, line):
+        return self._entry(font, line)[0]
+
+    def caret_x(self, font, line, col):
+        offsets = self._entry(font, line)[1]
+        x = offsets.get(col)
+        if x is None:
+            x = font.size(line[:col])[0]
+            offsets[col] = x
+        return x
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Fuentes compartidas por todas las escenas: (archivo, tamaño) -> Font
+_fonts = {}
+
+
+def get_font(file, size):
+    """
+    Devuelve la fuente `file` (None = la de pygame) en `size` puntos,
+    creándola solo la primera vez en todo el proceso.
+    """
+    key = (file, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(file, size)
+    return font
+
+
+class TextSurfaceCache:
+    """
+    Caché LRU de textos renderizados, por (texto, fuente, antialias, color).
+
+    Los rótulos fijos (títulos, botones, instrucciones) se renderizan una
+    sola vez; los que cambian (puntaje, tiempo) solo cuando cambia su texto.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, antialias, color):
+        key = (text, font, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, antialias, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+text_cache = TextSurfaceCache()
+
+
+def render_text(font, text, antialias, color):
+    """Como font.render(text, antialias, color), pero reutilizando la superficie."""
+    return text_cache.render(font, text, antialias, color)
+
+
+# Caracteres de control que las fuentes dibujan como "�" (se conservan \t y \n)
+_CONTROL_CHARS = dict.fromkeys(c for c in range(32) if c not in (9, 10))
+
+
+def clean_text(text):
+    """Normaliza (NFKC) y quita los caracteres no imprimibles de `text`."""
+    import unicodedata
+
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text.translate(_CONTROL_CHARS)
+
+
+def wrap_text(text, font, width):
+    """
+    Parte `text` en líneas que entran en `width` píxeles con `font`.
+
+    Respeta los saltos de línea del texto y corta por palabras. El ancho de
+    cada palabra distinta se mide una sola vez, así que el costo es lineal
+    en el largo del texto (y no en palabras x largo de línea).
+    """
+    return list(iter_wrapped(text, font, width))
+
+
+def iter_wrapped(text, font, width):
+    """
+    Como wrap_text, pero genera las líneas de a una y limpia cada párrafo
+    al llegar a él, para poder repartir un texto enorme entre varios cuadros.
+    """
+    space = font.size(" ")[0]
+    widths = {}
+
+    for paragraph in text.splitlines() or [""]:
+        paragraph = clean_text(paragraph)
+        current = []
+        current_width = 0
+        for word in paragraph.split(" "):
+            if not word:
+                continue
+            w = widths.get(word)
+            if w is None:
+                w = widths[word] = font.size(word)[0]
+            if current and current_width + space + w > width:
+                yield " ".join(current)
+                current = [word]
+                current_width = w
+            elif current:
+                current.append(word)
+                current_width += space + w
+            else:
+                current = [word]
+                current_width = w
+        yield " ".join(current)
@@ -2,6 +2,8 @@ from fpdf import FPDF
 from datetime import datetime
 import os
 
+from profiler import timed
+
 
 class ReportGenerator:
     def __init__(self):
@@ -16,6 +18,7 @@ class ReportGenerator:
             text = str(text)
         return text.encode("latin-1", "ignore").decode("latin-1")
 
+    @timed("generate_pdf")
     def generate_pdf(self, classification_result, grammar_text=None):
         pdf = FPDF()
         pdf.add_page()
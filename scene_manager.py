@@ -0,0 +1,166 @@
+import importlib
+import time
+
+import pygame
+
+from frame_scheduler import FrameScheduler, present
+from profiler import profiler, timer
+from profiler_overlay import ProfilerOverlay
+
+
+# Escenas que se abren desde el menú: acción -> (módulo, clase). Cada
+# módulo se importa la primera vez que se elige su opción, no al arrancar.
+SCENES = {
+    "classifier": ("classifier_ui", "ClassifierUI"),
+    "flashcards": ("games.flashcards", "FlashcardGame"),
+    "memory": ("games.memory_game", "MemoryGame"),
+    "quiz_race": ("games.quiz_race", "QuizRaceGame"),
+}
+
+
+class SceneManager:
+    """
+    Único bucle principal de la aplicación, con una pila de escenas.
+
+    Los eventos van a la escena de arriba de la pila, y lo que devuelve su
+    handle_event decide el cambio de escena:
+    - una acción de SCENES: se apila esa escena;
+    - "menu": se vuelve a la escena anterior;
+    - "quit" / "exit": se cierra la aplicación.
+
+    Cada escena se construye una sola vez y se guarda en `scenes`, así que
+    al volver a ella conserva su estado (texto del editor, progreso del
+    juego...) y el cambio es inmediato. Si la escena define enter() /
+    leave(), se llaman al mostrarla y al taparla o dejarla. Mientras su
+    atributo `busy` sea verdadero, el bucle no baja al ritmo de reposo.
+
+    Los eventos de trabajos en segundo plano (los que traen un `job` con
+    `owner`, ver background_jobs) van a la escena dueña aunque esté tapada,
+    para que su resultado no se pierda en otra escena.
+
+    F12 muestra / oculta el panel de rendimiento (ver profiler_overlay) en
+    cualquier escena.
+    """
+
+    def __init__(self, screen, assets, root):
+        self.screen = screen
+        self.assets = assets
+        self.stack = [root]
+        self.scenes = {}
+        self.overlay = ProfilerOverlay(screen)
+
+    @property
+    def current(self):
+        return self.stack[-1]
+
+    def scene(self, action):
+        """Devuelve la escena de `action`, importándola y creándola la primera vez."""
+        scene = self.scenes.get(action)
+        if scene is None:
+            module_name, class_name = SCENES[action]
+            module = importlib.import_module(module_name)
+            scene = getattr(module, class_name)(self.screen, self.assets)
+            self.scenes[action] = scene
+        return scene
+
+    def push(self, scene):
+        self._leave(self.current)
+        self.stack.append(scene)
+        self._enter(scene)
+
+    def pop(self):
+        if len(self.stack) > 1:
+            self._leave(self.stack.pop())
+            self._enter(self.current)
+
+    def dispatch(self, result):
+        """Aplica el resultado de handle_event. Devuelve False para salir."""
+        if result in SCENES:
+            self.push(self.scene(result))
+        elif result == "menu":
+            self.pop()
+        elif result in ("quit", "exit"):
+            return False
+        return True
+
+    def run(self, first_frame=None):
+        """
+        Bucle principal. `first_frame`, si se indica, se llama después de
+        mostrar el primer cuadro; si devuelve True, el bucle termina.
+        """
+        scheduler = FrameScheduler()
+        running = True
+
+        while running:
+            running = self.step(scheduler.events())
+            if getattr(self.current, "busy", False):
+                scheduler.wake()
+            if running and first_frame is not None and first_frame():
+                running = False
+
+        self.close()
+
+    def step(self, events):
+        """
+        Procesa `events` y dibuja un cuadro de la escena actual.
+        Devuelve False si hay que cerrar la aplicación.
+        """
+        frame_start = time.perf_counter()
+
+        with timer("events"):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    return False
+                if self.handle_overlay_key(event):
+                    continue
+                owner = getattr(getattr(event, "job", None), "owner", None)
+                if owner is not None and owner is not self.current:
+                    # Una escena tapada no puede cambiar de escena
+                    owner.handle_event(event)
+                    continue
+                if not self.dispatch(self.current.handle_event(event)):
+                    return False
+
+        scene = self.current
+        with timer("update"):
+            update = getattr(scene, "update", None)
+            if update is not None:
+                update()
+            self.overlay.update(scene.dirty)
+
+        if present(self.screen, scene.dirty, self.draw):
+            profiler.record("frame", (time.perf_counter() - frame_start) * 1000)
+        return True
+
+    def close(self):
+        for scene in self.scenes.values():
+            close = getattr(scene, "close", None)
+            if close is not None:
+                close()
+
+    def draw(self):
+        self.current.draw()
+        self.overlay.draw()
+
+    def handle_overlay_key(self, event):
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_F12:
+            self.overlay.toggle(self.current.dirty)
+            return True
+        if event.key == pygame.K_F11 and self.overlay.visible:
+            self.overlay.dump_csv()
+            return True
+        return False
+
+    def _enter(self, scene):
+        # Otra escena pintó toda la ventana
+        scene.dirty.add_all()
+        enter = getattr(scene, "enter", None)
+        if enter is not None:
+            enter()
+
+    def _leave(self, scene):
+        leave = getattr(scene, "leave", None)
+        if leave is not None:
+            leave()
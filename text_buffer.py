@@ -0,0 +1,213 @@
+import io
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+
+class LineIndex:
+    """
+    Inicios de línea de un texto, actualizados en cada inserción / borrado.
+
+    Igual que GapBuffer, se parte en el último punto de edición:
+    - `_before`: inicios <= punto de edición, en posición absoluta.
+    - `_after`: inicios posteriores guardados como distancia al final del
+      texto, en orden inverso (el último elemento es el más cercano).
+      Al escribir delante de ellos su distancia al final no cambia, así que
+      no hay que desplazarlos.
+
+    Las consultas (línea de una posición, inicio de una línea) usan bisect
+    y cuestan O(log n); las ediciones locales, O(1) amortizado.
+    """
+
+    def __init__(self, text=""):
+        self._before = []
+        self._after = []
+        self._length = 0
+        self.insert(0, text)
+
+    def line_count(self):
+        return 1 + len(self._before) + len(self._after)
+
+    def line_start(self, line):
+        if line <= 0:
+            return 0
+        line -= 1
+        if line < len(self._before):
+            return self._before[line]
+        return self._length - self._after[-1 - (line - len(self._before))]
+
+    def line_end(self, line):
+        """Posición del '\\n' que cierra la línea (o el final del texto)."""
+        if line + 1 < self.line_count():
+            return self.line_start(line + 1) - 1
+        return self._length
+
+    def line_of(self, pos):
+        """Índice de la línea que contiene la posición `pos`."""
+        line = bisect_right(self._before, pos)
+        if line < len(self._before):
+            return line
+        return line + len(self._after) - bisect_left(self._after, self._length - pos)
+
+    def insert(self, pos, text):
+        self._split(pos)
+        self._length += len(text)
+        start = text.find("\n")
+        while start != -1:
+            self._before.append(pos + start + 1)
+            start = text.find("\n", start + 1)
+
+    def delete(self, start, end):
+        self._split(start)
+        after = self._after
+        # Quitar los inicios de línea cuyo '\n' estaba en [start, end)
+        while after and self._length - after[-1] <= end:
+            after.pop()
+        self._length -= end - start
+
+    def _split(self, pos):
+        before = self._before
+        after = self._after
+        length = self._length
+        while before and before[-1] > pos:
+            after.append(length - before.pop())
+        while after and length - after[-1] <= pos:
+            before.append(length - after.pop())
+
+
+class GapBuffer:
+    """
+    Buffer de texto para el editor con un "hueco" (gap) en la posición de
+    edición.
+
+    Insertar o borrar junto al cursor solo mueve el hueco lo que se haya
+    desplazado el cursor desde la última edición, así que escribir es O(1)
+    amortizado aunque el texto tenga megabytes. El texto completo se arma
+    (y se guarda) solo cuando alguien lo pide con text().
+
+    `lines` es el LineIndex del contenido, actualizado en cada edición.
+    `version` aumenta con cada cambio (sirve para saber si un análisis
+    hecho sobre el texto sigue vigente) y `changes_since` dice qué líneas
+    cambiaron desde una versión, para reprocesar solo esas.
+    """
+
+    MIN_GAP = 64
+    MAX_CHANGES = 256
+
+    def __init__(self, text=""):
+        self._buf = list(text) + [""] * self.MIN_GAP
+        self._gap_start = len(text)
+        self._gap_end = len(self._buf)
+        self._text = text
+        self.lines = LineIndex(text)
+        self.version = 0
+        # (versión, primera línea, líneas quitadas, líneas puestas)
+        self._changes = deque(maxlen=self.MAX_CHANGES)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self._buf) - (self._gap_end - self._gap_start)
+
+    def text(self):
+        """Devuelve el contenido como string (se reutiliza hasta la próxima edición)."""
+        if self._text is None:
+            buf = self._buf
+            self._text = "".join(buf[: self._gap_start]) + "".join(buf[self._gap_end :])
+        return self._text
+
+    def changes_since(self, version):
+        """
+        Cambios de líneas posteriores a `version`, en orden, como tuplas
+        (primera línea, líneas quitadas, líneas puestas). Devuelve None si ya
+        no se pueden reconstruir (versión muy vieja o set_text de por medio).
+        """
+        if version == self.version:
+            return []
+        changes = self._changes
+        if version is None or not changes or changes[0][0] > version + 1:
+            return None
+        return [change[1:] for change in changes if change[0] > version]
+
+    def iter_lines(self):
+        """Itera las líneas (con su '\\n'), p. ej. para GrammarParser.iter_productions."""
+        return io.StringIO(self.text())
+
+    def line_text(self, line):
+        """Texto de la línea `line` (sin el '\\n')."""
+        return self.slice(self.lines.line_start(line), self.lines.line_end(line))
+
+    def slice(self, start, end):
+        """Texto entre las posiciones lógicas start y end, sin armar todo el buffer."""
+        if self._text is not None:
+            return self._text[start:end]
+        gs = self._gap_start
+        gap = self._gap_end - gs
+        buf = self._buf
+        if end <= gs:
+            return "".join(buf[start:end])
+        if start >= gs:
+            return "".join(buf[start + gap : end + gap])
+        return "".join(buf[start:gs]) + "".join(buf[self._gap_end : end + gap])
+
+    # ------------------------------------------------------------------
+    # Edición
+    # ------------------------------------------------------------------
+    def set_text(self, text):
+        version = self.version
+        self.__init__(text)
+        self.version = version + 1
+
+    def insert(self, pos, text):
+        if not text:
+            return
+        first = self.lines.line_of(pos)
+        self._move_gap(pos)
+        self._ensure_gap(len(text))
+        gs = self._gap_start
+        self._buf[gs : gs + len(text)] = text
+        self._gap_start = gs + len(text)
+        self._text = None
+        self.lines.insert(pos, text)
+        self.version += 1
+        self._changes.append((self.version, first, 1, 1 + text.count("\n")))
+
+    def delete(self, start, end):
+        """Borra el texto en [start, end)."""
+        if end <= start:
+            return
+        first = self.lines.line_of(start)
+        removed = self.lines.line_of(end) - first + 1
+        self._move_gap(start)
+        self._gap_end += end - start
+        self._text = None
+        self.lines.delete(start, end)
+        self.version += 1
+        self._changes.append((self.version, first, removed, 1))
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _move_gap(self, pos):
+        gs = self._gap_start
+        ge = self._gap_end
+        buf = self._buf
+        if pos < gs:
+            n = gs - pos
+            buf[ge - n : ge] = buf[pos:gs]
+            self._gap_start = pos
+            self._gap_end = ge - n
+        elif pos > gs:
+            n = pos - gs
+            buf[gs : gs + n] = buf[ge : ge + n]
+            self._gap_start = gs + n
+            self._gap_end = ge + n
+
+    def _ensure_gap(self, needed):
+        gap = self._gap_end - self._gap_start
+        if gap >= needed:
+            return
+        # Crecer de forma geométrica mantiene las inserciones en O(1) amortizado
+        grow = max(needed - gap, len(self._buf) // 2, self.MIN_GAP)
+        self._buf[self._gap_end : self._gap_end] = [""] * grow
+        self._gap_end += grow
@@ -0,0 +1,284 @@
+"""
+Benchmark reproducible de la interfaz, sin pantalla (SDL_VIDEODRIVER=dummy).
+
+Uso:
+
+    python ui_benchmark.py -o resultados.json
+    python ui_benchmark.py --scenario classifier_large --lines 50000
+
+Cada escenario abre una escena nueva y reproduce una secuencia fija de
+eventos (pegar una gramática grande, escribir, F1, desplazarse...), un
+cuadro por paso, con el mismo SceneManager.step que usa la aplicación.
+Se mide la latencia de cada cuadro (eventos + actualización + dibujo +
+envío a pantalla) y se guarda en JSON junto con el desglose del
+profiler, para comparar versiones en una máquina sin pantalla.
+"""
+import os
+
+# Antes de inicializar pygame: sin ventana ni audio
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import pygame
+
+from classification_cache import default_cache
+from menu_principal import MainMenu
+from profiler import profiler, summarize
+from render_cache import text_cache
+from scene_manager import SceneManager
+
+
+# ----------------------------------------------------------------------
+# Eventos sintéticos
+# ----------------------------------------------------------------------
+def key(k, unicode=""):
+    return pygame.event.Event(pygame.KEYDOWN, key=k, mod=0, unicode=unicode, scancode=0)
+
+
+def typed(text):
+    """Un evento KEYDOWN por carácter (Enter para los saltos de línea)."""
+    for ch in text:
+        if ch == "\n":
+            yield key(pygame.K_RETURN)
+        else:
+            yield key(0, ch)
+
+
+def mouse_move(pos, previous):
+    rel = (pos[0] - previous[0], pos[1] - previous[1])
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=rel, buttons=(0, 0, 0))
+
+
+def mouse_button(event_type, pos):
+    return pygame.event.Event(event_type, pos=pos, button=1)
+
+
+def wait_for_classification(scene, label="wait_classify"):
+    """Cuadros vacíos hasta que termina la clasificación en segundo plano (F1)."""
+    while scene.classify_job is not None or scene.busy:
+        time.sleep(0.001)
+        yield label, [], None
+
+
+def sample_grammar(lines):
+    """Gramática libre de contexto de `lines` líneas, siempre la misma."""
+    rules = ["S -> A0 S B0 | ab"]
+    for i in range(lines - 1):
+        rules.append(f"A{i} -> a A{i + 1} | b{i % 7} | ε")
+    return "\n".join(rules) + "\n"
+
+
+# ----------------------------------------------------------------------
+# Escenarios: (acción de escena, generador de pasos)
+# Cada paso es (etiqueta, eventos, función opcional sobre la escena).
+# ----------------------------------------------------------------------
+def classifier_large(scene, lines=20000):
+    grammar = sample_grammar(lines)
+
+    # Pegar: es lo que hace Ctrl+V con el texto del portapapeles
+    yield "paste", [], lambda s: s.insert_text(grammar)
+
+    for event in typed("S -> aSb | ab\n"):
+        yield "type", [event], None
+    for _ in range(60):
+        yield "editor_page", [key(pygame.K_PAGEUP)], None
+    for _ in range(60):
+        yield "editor_page", [key(pygame.K_PAGEDOWN)], None
+
+    yield "classify", [key(pygame.K_F1)], None
+    yield from wait_for_classification(scene)
+
+    # Arrastrar la barra del resultado de arriba abajo
+    track = scene.scrollbar_track("output")
+    x = track.centerx
+    previous = (x, track.y)
+    yield "scroll_result", [mouse_button(pygame.MOUSEBUTTONDOWN, previous)], None
+    for i in range(1, 121):
+        pos = (x, track.y + track.height * i // 120)
+        yield "scroll_result", [mouse_move(pos, previous)], None
+        previous = pos
+    yield "scroll_result", [mouse_button(pygame.MOUSEBUTTONUP, previous)], None
+
+    for _ in range(30):
+        yield "idle", [], None
+
+
+def classifier_typing(scene, lines=0):
+    for event in typed("S -> aSB | ab\nB -> b | bB\nA -> a\n" * 10):
+        yield "type", [event], None
+    yield "classify", [key(pygame.K_F1)], None
+    yield from wait_for_classification(scene)
+    for _ in range(30):
+        yield "idle", [], None
+
+
+def flashcards(scene, lines=0):
+    previous = (0, 0)
+    for i in range(80):
+        yield "next_card", [key(pygame.K_RIGHT)], None
+        yield "toggle_answer", [key(pygame.K_SPACE)], None
+        button = scene.buttons[i % len(scene.buttons)]["rect"]
+        yield "hover", [mouse_move(button.center, previous)], None
+        previous = button.center
+
+
+def memory(scene, lines=0):
+    for rect in scene.card_rects:
+        yield "click_card", [mouse_button(pygame.MOUSEBUTTONDOWN, rect.center)], None
+    # Destapar todo: el peor caso de dibujo
+    yield "reveal_all", [], lambda s: s.matched_pairs.extend(range(len(s.cards)))
+    for _ in range(30):
+        yield "idle", [], None
+
+
+def quiz_race(scene, lines=0):
+    previous = (0, 0)
+    for i in range(120):
+        rect = scene.option_buttons[i % len(scene.option_buttons)]
+        yield "hover", [mouse_move(rect.center, previous)], None
+        previous = rect.center
+    for i in range(20):
+        yield "answer", [key(pygame.K_1 + i % 4)], None
+
+
+def menu(scene, lines=0):
+    previous = (0, 0)
+    for i in range(100):
+        rect = scene.buttons[i % len(scene.buttons)]["rect"]
+        yield "hover", [mouse_move(rect.center, previous)], None
+        previous = rect.center
+
+
+SCENARIOS = {
+    "classifier_large": ("classifier", classifier_large),
+    "classifier_typing": ("classifier", classifier_typing),
+    "flashcards": ("flashcards", flashcards),
+    "memory": ("memory", memory),
+    "quiz_race": ("quiz_race", quiz_race),
+    "menu": (None, menu),
+}
+
+
+# ----------------------------------------------------------------------
+# Ejecución
+# ----------------------------------------------------------------------
+def run_scenario(app, name, lines):
+    action, script = SCENARIOS[name]
+
+    # Estado limpio en cada escenario: escenas y cachés nuevas
+    default_cache.clear()
+    text_cache.clear()
+    manager = SceneManager(app.screen, app.assets, MainMenu(app.screen, app.assets))
+    if action is not None:
+        manager.push(manager.scene(action))
+    scene = manager.current
+    manager.step([])  # primer cuadro completo, fuera de la medición
+
+    profiler.clear()
+    frame_ms = []
+    by_step = {}
+    started = time.perf_counter()
+
+    for label, events, apply in script(scene, lines):
+        start = time.perf_counter()
+        if apply is not None:
+            apply(scene)
+            scene.dirty.add_all()
+        # Los eventos de la cola son los de los trabajos en segundo plano
+        manager.step(events + pygame.event.get())
+        ms = (time.perf_counter() - start) * 1000
+        frame_ms.append(ms)
+        by_step.setdefault(label, []).append(ms)
+
+    total_ms = (time.perf_counter() - started) * 1000
+    profile = profiler.stats()
+    manager.close()
+
+    return {
+        "frames": len(frame_ms),
+        "total_ms": round(total_ms, 3),
+        "frame_ms": _rounded(summarize(frame_ms)),
+        "steps": {label: _rounded(summarize(values)) for label, values in by_step.items()},
+        "profile": {label: _rounded(values) for label, values in profile.items()},
+    }
+
+
+def run_benchmark(names=None, lines=20000):
+    # La aplicación real da la misma ventana, recursos y menú
+    from main import ChomskyClassifierApp
+
+    app = ChomskyClassifierApp()
+    results = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "video_driver": pygame.display.get_driver(),
+            "screen": list(app.screen.get_size()),
+            "lines": lines,
+        },
+        "scenarios": {},
+    }
+    for name in names or SCENARIOS:
+        results["scenarios"][name] = run_scenario(app, name, lines)
+    pygame.quit()
+    return results
+
+
+def _rounded(stats):
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()}
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(
+        prog="python ui_benchmark.py",
+        description="Mide la latencia por cuadro de la interfaz con eventos guionados (sin pantalla).",
+    )
+    arg_parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Escenario a ejecutar (se puede repetir; por defecto, todos).",
+    )
+    arg_parser.add_argument(
+        "--lines",
+        type=int,
+        default=20000,
+        help="Líneas de la gramática pegada en classifier_large (por defecto 20000).",
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        help="Archivo JSON de salida (por defecto, la salida estándar).",
+    )
+    return arg_parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    results = run_benchmark(args.scenario, args.lines)
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        for name, scenario in results["scenarios"].items():
+            stats = scenario["frame_ms"]
+            print(
+                f"{name:<18} {scenario['frames']:5d} cuadros  "
+                f"p50 {stats['p50']:7.2f} ms  p95 {stats['p95']:7.2f} ms  max {stats['max']:8.1f} ms"
+            )
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
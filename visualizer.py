@@ -1,67 +1,71 @@
 import graphviz
+import hashlib
 import os
-from datetime import datetime
+import re
+import shutil
+
+from grammar_ir import GrammarIR, is_nonterminal
+from profiler import timed
+
+# Archivos que administra la caché: <prefijo>_diagram_<hash>.<formato>, y
+# el código DOT sin extensión que puede quedar de un render interrumpido
+CACHED_FILE_PATTERN = re.compile(r"^(grammar|automaton)_diagram_[0-9a-f]{16}(\.\w+)?$")
 
 
 class GrammarVisualizer:
-    def __init__(self):
+    def __init__(self, max_cache_bytes=50 * 1024 * 1024):
         self.output_dir = "output"
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-    def generate_diagram(self, productions, filename=None):
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"grammar_diagram_{timestamp}"
+        # Caché de diagramas por hash del código DOT + formato
+        self.max_cache_bytes = max_cache_bytes
+        self.cache_hits = 0
+        self.cache_misses = 0
 
+    @timed("generate_diagram")
+    def generate_diagram(self, productions, filename=None):
         dot = graphviz.Digraph(
             comment="Diagrama de gramática - Chomsky Classifier AI"
         )
         dot.attr(rankdir="LR", fontsize="10", fontname="Arial")
 
+        ir = GrammarIR.coerce(productions)
+
         # Nodo inicial
-        if "S" in productions:
+        if "S" in ir.lhs_ids:
             dot.node("S", "S (inicio)", shape="doublecircle", style="filled", fillcolor="lightblue")
 
         # Crear nodos para variables
-        for lhs in productions.keys():
+        for lhs in ir.lhs_names:
             if lhs != "S":
                 dot.node(lhs, lhs, shape="circle", style="filled", fillcolor="lightgray")
 
         # Crear aristas para producciones
-        production_count = 0
-        for lhs, rhs_list in productions.items():
-            for rhs in rhs_list:
-                production_count += 1
-                rhs_str = "".join(rhs) if rhs else "ε"
-
-                # Para producciones regulares A → aB, conectar A con B etiquetando con 'a'
-                if len(rhs) == 2 and rhs[0].islower() and rhs[1].isupper():
-                    dot.edge(lhs, rhs[1], label=rhs[0])
-                else:
-                    prod_node = f"prod_{production_count}"
-                    dot.node(
-                        prod_node,
-                        f"{lhs} → {rhs_str}",
-                        shape="rectangle",
-                        style="filled",
-                        fillcolor="lightyellow",
-                        fontsize="9",
-                    )
-                    dot.edge(lhs, prod_node)
-
-        output_path = os.path.join(self.output_dir, filename)
-        dot.render(output_path, format="png", cleanup=True)
-        return f"{output_path}.png"
+        for i, (lhs, rhs) in enumerate(ir.iter_productions()):
+            production_count = i + 1
+
+            # Para producciones regulares A → aB, conectar A con B etiquetando con 'a'
+            if len(rhs) == 2 and rhs[0].islower() and is_nonterminal(rhs[1]):
+                dot.edge(lhs, rhs[1], label=rhs[0])
+            else:
+                rhs_str = rhs or "ε"
+                prod_node = f"prod_{production_count}"
+                dot.node(
+                    prod_node,
+                    f"{lhs} → {rhs_str}",
+                    shape="rectangle",
+                    style="filled",
+                    fillcolor="lightyellow",
+                    fontsize="9",
+                )
+                dot.edge(lhs, prod_node)
+
+        return self._render_cached(dot, "grammar", filename)
     
     def generate_automaton_diagram_from_text(self, text, filename=None):
-        import re
         from graphviz import Digraph
 
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"automaton_diagram_{timestamp}"
-
         dot = Digraph(comment="Automaton / Turing Machine")
         dot.attr(rankdir="LR", size="8,5")
         dot.attr("node", shape="circle", fontsize="12")
@@ -120,7 +124,7 @@ class GrammarVisualizer:
             states = {"q0"}
             initial_state = initial_state or "q0"
 
-        for s in states:
+        for s in sorted(states):
             if s in accept_states:
                 dot.node(s, shape="doublecircle", style="filled", fillcolor="lightgreen")
             else:
@@ -136,9 +140,80 @@ class GrammarVisualizer:
             dot.edge(q_from, q_to, label=label)
 
         # Guardar diagrama
-        output_path = os.path.join(self.output_dir, filename)
-        dot.render(output_path, format="png", cleanup=True)
-        return f"{output_path}.png"
+        return self._render_cached(dot, "automaton", filename)
+
+    # ------------------------------------------------------------------
+    # Caché de diagramas
+    # ------------------------------------------------------------------
+    def _render_cached(self, dot, prefix, filename=None, fmt="png"):
+        """
+        Renderiza `dot` solo si no existe ya un archivo para el mismo código
+        DOT y formato. Con `filename` se deja además una copia con ese nombre.
+        """
+        digest = hashlib.sha1(f"{fmt}\n{dot.source}".encode("utf-8")).hexdigest()[:16]
+        cached_path = os.path.join(self.output_dir, f"{prefix}_diagram_{digest}.{fmt}")
+
+        if os.path.exists(cached_path):
+            self.cache_hits += 1
+            # La fecha de modificación marca el último uso (para el desalojo LRU)
+            os.utime(cached_path)
+        else:
+            self.cache_misses += 1
+            source_path = cached_path[: -len(fmt) - 1]
+            try:
+                dot.render(source_path, format=fmt, cleanup=True)
+            except Exception:
+                # cleanup solo borra el código DOT si el render terminó bien
+                try:
+                    os.remove(source_path)
+                except OSError:
+                    pass
+                raise
+            self._evict(keep=cached_path)
+
+        if filename is None:
+            return cached_path
+
+        output_path = os.path.join(self.output_dir, f"{filename}.{fmt}")
+        shutil.copyfile(cached_path, output_path)
+        return output_path
+
+    def _cached_files(self):
+        files = []
+        for name in os.listdir(self.output_dir):
+            if CACHED_FILE_PATTERN.match(name):
+                path = os.path.join(self.output_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _evict(self, keep=None):
+        """Borra los diagramas usados hace más tiempo hasta respetar max_cache_bytes."""
+        files = sorted(self._cached_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_cache_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def cache_stats(self):
+        files = self._cached_files()
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "files": len(files),
+            "bytes": sum(size for _, size, _ in files),
+            "max_bytes": self.max_cache_bytes,
+        }
 
 
     